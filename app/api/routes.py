@@ -1,17 +1,37 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import errno
+import functools
+import io
+import os
 import re
 import shutil
 import tempfile
 import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 from fastapi import APIRouter, File, Form, Request, UploadFile
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 
-from app.core.constants import ART_ALLOWED_EXT, ART_TYPES, CD_THRESHOLD_BYTES, REQUIRED_FOLDERS
-from app.core.http import api_response, step
+from app.core.constants import (
+    ART_ALLOWED_EXT,
+    ART_DOWNLOAD_CONCURRENCY,
+    ART_TYPE_SET,
+    ART_TYPES,
+    CD_THRESHOLD_BYTES,
+    COPY_BUFSIZE,
+    DISK_PROBE_INTERVAL_SEC,
+    IMPORT_PARALLELISM,
+    IMPORT_STAGING_DIR,
+    REQUIRED_FOLDERS,
+    TEMPLATE_AUTO_RELOAD,
+    UPLOAD_CHUNK_BYTES,
+)
+from app.core.http import Step, api_response, step
 from app.core.schemas import (
     ArtSaveRequest,
     ArtSearchRequest,
@@ -22,14 +42,30 @@ from app.core.schemas import (
 )
 from app.services.art_service import (
     art_search_cache_key,
+    build_art_search_query,
     download_image,
     enforce_art_search_rate_limit,
     get_cached_art_search,
     optimize_art_image,
+    schedule_art_search_refresh,
     search_art_candidates,
     store_cached_art_search,
 )
-from app.services.format_service import is_macos, run_cmd, sanitize_volume_label, validate_format_target, wait_mount_point
+from app.services.file_service import (
+    COPY_EXECUTOR,
+    disable_page_cache,
+    fast_copy,
+    kernel_copy,
+    preallocate,
+    same_filesystem,
+)
+from app.services.format_service import (
+    is_macos,
+    run_cmd_async,
+    sanitize_volume_label,
+    validate_format_target,
+    wait_mount_point,
+)
 from app.services.game_service import (
     build_opl_iso_filename,
     derive_game_name,
@@ -40,16 +76,107 @@ from app.services.game_service import (
     remove_manifest_entries,
     resolve_game_id,
     resolve_game_id_for_target,
-    upsert_manifest_entry,
+    upsert_manifest_entries,
+)
+from app.services.target_service import (
+    compute_buffer,
+    ensure_required_folders,
+    existing_required_folders,
+    free_space,
+    human_bytes,
+    invalidate_target_cache,
+    resolve_target,
+    validate_target_access,
 )
-from app.services.target_service import compute_buffer, ensure_required_folders, human_bytes, resolve_target, validate_target_access
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 templates = Jinja2Templates(directory="app/templates")
+templates.env.auto_reload = TEMPLATE_AUTO_RELOAD
+_ART_FILE_ID_RE = re.compile(r"^([A-Z]{4}_[0-9]{3}\.[0-9]{2})_")
+
+
+def _upload_fd(upload: UploadFile) -> Optional[int]:
+    # Large uploads are already spooled to a temp file by Starlette; a fd lets the kernel move the bytes.
+    try:
+        return upload.file.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
 
 
-def _should_skip_scan_iso(file_path: Path) -> bool:
-    name = file_path.name
+def _stage_upload(upload: UploadFile, staged_path: Path) -> int:
+    written = 0
+    preallocated = False
+    fd = os.open(staged_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        disable_page_cache(fd)
+        preallocated = preallocate(fd, upload.size or 0)
+        in_fd = _upload_fd(upload)
+        if in_fd is not None:
+            written = kernel_copy(in_fd, fd, 0, os.fstat(in_fd).st_size)
+            upload.file.seek(written)
+            os.lseek(fd, written, os.SEEK_SET)
+        while True:
+            chunk = upload.file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(fd, view) :]
+            written += len(chunk)
+        if preallocated and written != upload.size:
+            os.ftruncate(fd, written)
+        if hasattr(os, "posix_fadvise"):
+            # Staged ISOs are read back once for the copy; don't let them crowd out the page cache.
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return written
+
+
+async def _close_uploads(uploads: Iterable[Optional[UploadFile]]) -> None:
+    await asyncio.gather(*(upload.close() for upload in uploads if upload), return_exceptions=True)
+
+
+async def _download_art(limit: asyncio.Semaphore, image_url: str, art_type: str) -> tuple[bytes, str]:
+    async with limit:
+        return await asyncio.to_thread(download_image, image_url, art_type)
+
+
+def _split_art_results(
+    art_types: list[str], results: list[Any]
+) -> tuple[list[dict[str, Any]], list[tuple[str, Exception]]]:
+    saved: list[dict[str, Any]] = []
+    failed: list[tuple[str, Exception]] = []
+    for art_type, result in zip(art_types, results):
+        if isinstance(result, Exception):
+            failed.append((art_type, result))
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            saved.append(result)
+    return saved, failed
+
+
+def _art_save_failed(
+    message: str, saved: list[dict[str, Any]], failed: list[tuple[str, Exception]], steps: list[Step]
+) -> ORJSONResponse:
+    # Every art task has finished by now, so "saved" lists exactly what was written to ART.
+    client_error = all(isinstance(exc, ValueError) for _, exc in failed)
+    return api_response(
+        status="error",
+        state="failed",
+        message=str(failed[0][1]) if client_error and len(failed) == 1 else message,
+        details={
+            "saved": saved,
+            "failed": [{"art_type": art_type, "error": str(exc)} for art_type, exc in failed],
+        },
+        next_action="fix_request_and_retry" if client_error else "retry",
+        steps=steps,
+        status_code=400 if client_error else 500,
+    )
+
+
+def _should_skip_scan_iso(name: str) -> bool:
     if name.startswith("."):
         return True
     if name.startswith("._"):
@@ -57,9 +184,85 @@ def _should_skip_scan_iso(file_path: Path) -> bool:
     return False
 
 
+def _sorted_files(folder: Path) -> list[os.DirEntry[str]]:
+    try:
+        with os.scandir(folder) as entries:
+            return sorted((entry for entry in entries if entry.is_file()), key=lambda entry: entry.name)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def _scan_target_games(target: Path) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    # Runs in a worker thread: a large library on a slow USB stick can take seconds to list.
+    art_map: dict[str, list[str]] = {}
+    for art_entry in _sorted_files(target / "ART"):
+        stem, ext = os.path.splitext(art_entry.name)
+        if ext.lower() not in ART_ALLOWED_EXT:
+            continue
+        match = _ART_FILE_ID_RE.match(stem.upper())
+        if not match:
+            continue
+        art_map.setdefault(match.group(1), []).append(art_entry.name)
+
+    games: list[dict[str, Any]] = []
+    total_games_bytes = 0
+    for folder in ("DVD", "CD"):
+        for iso_entry in _sorted_files(target / folder):
+            name = iso_entry.name
+            if os.path.splitext(name)[1].lower() != ".iso" or _should_skip_scan_iso(name):
+                continue
+            game_id = extract_game_id_from_filename(name)
+            try:
+                game_name = derive_game_name(None, name)
+            except ValueError:
+                game_name = os.path.splitext(name)[0]
+            # Listed in name order, so each game's art list is already sorted.
+            game_art = art_map.get(game_id or "", [])
+            size = iso_entry.stat().st_size
+            total_games_bytes += size
+            games.append(
+                {
+                    "game_id": game_id,
+                    "game_name": game_name,
+                    "destination_filename": name,
+                    "target_folder": folder,
+                    "path": iso_entry.path,
+                    "size_bytes": size,
+                    "size_human": human_bytes(size),
+                    "art_count": len(game_art),
+                    "art_files": game_art,
+                }
+            )
+
+    usage = shutil.disk_usage(target)
+    used_percent = 0.0
+    if usage.total > 0:
+        used_percent = round((usage.used / usage.total) * 100, 2)
+    storage = {
+        "games_bytes": total_games_bytes,
+        "games_human": human_bytes(total_games_bytes),
+        "total_bytes": usage.total,
+        "total_human": human_bytes(usage.total),
+        "used_bytes": usage.used,
+        "used_human": human_bytes(usage.used),
+        "free_bytes": usage.free,
+        "free_human": human_bytes(usage.free),
+        "used_percent": used_percent,
+    }
+    return games, storage
+
+
+@functools.lru_cache(maxsize=1)
+def _render_index() -> bytes:
+    # Encoded once so each hit only copies the cached body into the response.
+    return templates.get_template("index.html").render().encode("utf-8")
+
+
 @router.get("/")
 async def index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    if TEMPLATE_AUTO_RELOAD:
+        return templates.TemplateResponse("index.html", {"request": request})
+    return HTMLResponse(_render_index())
 
 
 @router.get("/api/health")
@@ -69,7 +272,7 @@ async def health() -> dict[str, str]:
 
 @router.get("/api/pick-target-folder")
 async def pick_target_folder():
-    steps: list[dict[str, Any]] = []
+    steps: list[Step] = []
     try:
         if not is_macos():
             return api_response(
@@ -82,12 +285,12 @@ async def pick_target_folder():
                 status_code=400,
             )
 
-        result = run_cmd(
+        result = await run_cmd_async(
             [
                 "osascript",
                 "-e",
                 'POSIX path of (choose folder with prompt "Select PS2 target parent folder")',
-            ]
+            ],
         )
         if result.returncode != 0:
             error_text = (result.stderr or result.stdout).strip()
@@ -134,7 +337,7 @@ async def pick_target_folder():
 
 @router.post("/api/format-target")
 async def format_target(payload: FormatTargetRequest):
-    steps: list[dict[str, Any]] = []
+    steps: list[Step] = []
     try:
         if not is_macos():
             steps.append(step("formatting", "error", "format endpoint currently supports macOS only"))
@@ -175,7 +378,7 @@ async def format_target(payload: FormatTargetRequest):
             )
 
         steps.append(step("formatting", "info", "inspecting disk metadata"))
-        disk_device, volume_info, whole_info = validate_format_target(target)
+        disk_device, volume_info, whole_info = await asyncio.to_thread(validate_format_target, target)
         steps.append(
             step(
                 "formatting",
@@ -198,7 +401,9 @@ async def format_target(payload: FormatTargetRequest):
                 {"device": disk_device, "label": label},
             )
         )
-        erase_result = run_cmd(["diskutil", "eraseDisk", "MS-DOS", label, "MBRFormat", f"/dev/{disk_device}"])
+        erase_result = await run_cmd_async(
+            ["diskutil", "eraseDisk", "MS-DOS", label, "MBRFormat", f"/dev/{disk_device}"]
+        )
         if erase_result.returncode != 0:
             steps.append(
                 step(
@@ -218,8 +423,9 @@ async def format_target(payload: FormatTargetRequest):
                 status_code=500,
             )
 
+        invalidate_target_cache(target)
         steps.append(step("formatting", "info", "mounting formatted disk"))
-        mount_result = run_cmd(["diskutil", "mountDisk", f"/dev/{disk_device}"])
+        mount_result = await run_cmd_async(["diskutil", "mountDisk", f"/dev/{disk_device}"])
         if mount_result.returncode != 0:
             steps.append(
                 step(
@@ -230,7 +436,7 @@ async def format_target(payload: FormatTargetRequest):
                 )
             )
 
-        mounted_path = wait_mount_point(disk_device, expected_label=label)
+        mounted_path = await wait_mount_point(disk_device, expected_label=label)
         steps.append(
             step(
                 "formatting",
@@ -241,7 +447,7 @@ async def format_target(payload: FormatTargetRequest):
         )
 
         try:
-            missing, created = ensure_required_folders(mounted_path)
+            missing, created = await asyncio.to_thread(ensure_required_folders, mounted_path)
         except NotADirectoryError as exc:
             steps.append(step("ensuring_structure", "error", str(exc)))
             return api_response(
@@ -286,12 +492,12 @@ async def format_target(payload: FormatTargetRequest):
 
 @router.post("/api/validate-target")
 async def validate_target(payload: ValidateTargetRequest):
-    steps: list[dict[str, Any]] = []
+    steps: list[Step] = []
     try:
         target = resolve_target(payload.target_path)
         steps.append(step("validating_target", "info", "checking target path", {"target": str(target)}))
 
-        ok, reason = validate_target_access(target)
+        ok, reason = await asyncio.to_thread(validate_target_access, target)
         if not ok:
             steps.append(step("validating_target", "error", reason))
             return api_response(
@@ -309,7 +515,7 @@ async def validate_target(payload: ValidateTargetRequest):
         if payload.ensure_folders:
             steps.append(step("ensuring_structure", "info", "ensuring required folders"))
             try:
-                missing, created = ensure_required_folders(target)
+                missing, created = await asyncio.to_thread(ensure_required_folders, target)
             except NotADirectoryError as exc:
                 steps.append(step("ensuring_structure", "error", str(exc)))
                 return api_response(
@@ -330,7 +536,11 @@ async def validate_target(payload: ValidateTargetRequest):
                 )
             )
 
-        existing = sorted([f for f in REQUIRED_FOLDERS if (target / f).exists()])
+        if payload.ensure_folders:
+            # Every required folder exists once ensure_required_folders has succeeded.
+            existing = list(REQUIRED_FOLDERS)
+        else:
+            existing = await asyncio.to_thread(existing_required_folders, target)
         steps.append(step("validated", "success", "target is ready"))
         return api_response(
             status="success",
@@ -338,7 +548,7 @@ async def validate_target(payload: ValidateTargetRequest):
             message="target path is valid and ready",
             details={
                 "target": str(target),
-                "required_folders": REQUIRED_FOLDERS,
+                "required_folders": list(REQUIRED_FOLDERS),
                 "existing": existing,
                 "created": created,
             },
@@ -360,11 +570,11 @@ async def validate_target(payload: ValidateTargetRequest):
 
 @router.post("/api/games/scan")
 async def scan_games(payload: ScanGamesRequest):
-    steps: list[dict[str, Any]] = []
+    steps: list[Step] = []
     try:
         target = resolve_target(payload.target_path)
         steps.append(step("scanning_games", "info", "checking target path", {"target": str(target)}))
-        ok, reason = validate_target_access(target)
+        ok, reason = await asyncio.to_thread(validate_target_access, target)
         if not ok:
             steps.append(step("scanning_games", "error", reason))
             return api_response(
@@ -377,66 +587,7 @@ async def scan_games(payload: ScanGamesRequest):
                 status_code=400,
             )
 
-        art_dir = target / "ART"
-        games: list[dict[str, Any]] = []
-        art_id_pattern = re.compile(r"^([A-Z]{4}_[0-9]{3}\.[0-9]{2})_")
-        art_map: dict[str, list[str]] = {}
-        if art_dir.exists():
-            for art_file in sorted(art_dir.iterdir()):
-                if not art_file.is_file() or art_file.suffix.lower() not in ART_ALLOWED_EXT:
-                    continue
-                match = art_id_pattern.match(art_file.stem.upper())
-                if not match:
-                    continue
-                art_map.setdefault(match.group(1), []).append(art_file.name)
-
-        for folder in ("DVD", "CD"):
-            folder_path = target / folder
-            if not folder_path.exists() or not folder_path.is_dir():
-                continue
-            for iso_file in sorted(folder_path.iterdir()):
-                if not iso_file.is_file():
-                    continue
-                if iso_file.suffix.lower() != ".iso":
-                    continue
-                if _should_skip_scan_iso(iso_file):
-                    continue
-                game_id = extract_game_id_from_filename(iso_file.name)
-                try:
-                    game_name = derive_game_name(None, iso_file.name)
-                except ValueError:
-                    game_name = iso_file.stem
-                game_art = sorted(art_map.get(game_id or "", []))
-                games.append(
-                    {
-                        "game_id": game_id,
-                        "game_name": game_name,
-                        "destination_filename": iso_file.name,
-                        "target_folder": folder,
-                        "path": str(iso_file),
-                        "size_bytes": iso_file.stat().st_size,
-                        "size_human": human_bytes(iso_file.stat().st_size),
-                        "art_count": len(game_art),
-                        "art_files": game_art,
-                    }
-                )
-
-        total_games_bytes = sum(int(game.get("size_bytes", 0)) for game in games)
-        usage = shutil.disk_usage(target)
-        used_percent = 0.0
-        if usage.total > 0:
-            used_percent = round((usage.used / usage.total) * 100, 2)
-        storage = {
-            "games_bytes": total_games_bytes,
-            "games_human": human_bytes(total_games_bytes),
-            "total_bytes": usage.total,
-            "total_human": human_bytes(usage.total),
-            "used_bytes": usage.used,
-            "used_human": human_bytes(usage.used),
-            "free_bytes": usage.free,
-            "free_human": human_bytes(usage.free),
-            "used_percent": used_percent,
-        }
+        games, storage = await asyncio.to_thread(_scan_target_games, target)
 
         steps.append(step("scanning_games", "success", "scan completed", {"count": len(games), "storage": storage}))
         return api_response(
@@ -461,7 +612,7 @@ async def scan_games(payload: ScanGamesRequest):
 
 @router.post("/api/games/delete")
 async def delete_game(payload: DeleteGameRequest):
-    steps: list[dict[str, Any]] = []
+    steps: list[Step] = []
     try:
         target = resolve_target(payload.target_path)
         normalized_game_id = normalize_game_id(payload.game_id)
@@ -475,7 +626,7 @@ async def delete_game(payload: DeleteGameRequest):
                 {"target": str(target), "game_id": normalized_game_id, "destination_filename": requested_filename},
             )
         )
-        ok, reason = validate_target_access(target)
+        ok, reason = await asyncio.to_thread(validate_target_access, target)
         if not ok:
             steps.append(step("deleting_game", "error", reason))
             return api_response(
@@ -492,11 +643,11 @@ async def delete_game(payload: DeleteGameRequest):
         candidates: list[Path] = []
         for folder in ("DVD", "CD"):
             folder_path = target / folder
-            if not folder_path.exists() or not folder_path.is_dir():
+            if not folder_path.is_dir():
                 continue
             if requested_filename:
                 candidate = folder_path / Path(requested_filename).name
-                if candidate.exists() and candidate.is_file():
+                if candidate.is_file():
                     candidates.append(candidate)
                 continue
             candidates.extend(folder_path.glob(f"{normalized_game_id}*.iso"))
@@ -511,7 +662,7 @@ async def delete_game(payload: DeleteGameRequest):
             unique_candidates.append(candidate)
 
         for game_file in unique_candidates:
-            if game_file.exists() and game_file.is_file():
+            if game_file.is_file():
                 game_file.unlink()
                 deleted_game_files.append(str(game_file))
 
@@ -528,7 +679,7 @@ async def delete_game(payload: DeleteGameRequest):
 
         art_dir = target / "ART"
         deleted_art_files: list[str] = []
-        if art_dir.exists() and art_dir.is_dir():
+        if art_dir.is_dir():
             for art_file in art_dir.glob(f"{normalized_game_id}_*.*"):
                 if not art_file.is_file() or art_file.suffix.lower() not in ART_ALLOWED_EXT:
                     continue
@@ -585,25 +736,29 @@ async def delete_game(payload: DeleteGameRequest):
 
 @router.post("/api/art/search")
 async def search_art(payload: ArtSearchRequest, request: Request):
-    steps: list[dict[str, Any]] = []
+    steps: list[Step] = []
     try:
         game_query = derive_game_name(payload.game_name, payload.source_filename)
         target: Optional[Path] = None
         if payload.target_path and payload.target_path.strip():
             target = resolve_target(payload.target_path)
-        game_id, generated, id_source = resolve_game_id_for_target(target, game_query, payload.source_filename)
-        query = f"{game_query} PS2 cover art"
+        game_id, generated, id_source = await asyncio.to_thread(
+            resolve_game_id_for_target, target, game_query, payload.source_filename
+        )
+        query = build_art_search_query(game_query)
         now_ts = time.time()
         provider_name = "rawg"
         cache_key = art_search_cache_key(provider_name, game_id, query, payload.max_results)
-        cached = get_cached_art_search(cache_key, now_ts)
+        cached, stale = await asyncio.to_thread(get_cached_art_search, cache_key, now_ts)
         if cached is not None:
+            if stale:
+                schedule_art_search_refresh(cache_key, query, payload.max_results)
             steps.append(
                 step(
                     "searching_art",
                     "success",
                     "loaded art candidates from cache",
-                    {"count": len(cached), "provider": provider_name},
+                    {"count": len(cached), "provider": provider_name, "stale": stale},
                 )
             )
             return api_response(
@@ -618,6 +773,7 @@ async def search_art(payload: ArtSearchRequest, request: Request):
                     "art_types": ART_TYPES,
                     "candidates": cached,
                     "cache_hit": True,
+                    "cache_stale": stale,
                     "provider_used": provider_name,
                 },
                 next_action="preview_and_select_images",
@@ -638,7 +794,7 @@ async def search_art(payload: ArtSearchRequest, request: Request):
             )
 
         steps.append(step("searching_art", "info", "searching images", {"query": query, "provider": provider_name}))
-        provider_used, candidates = search_art_candidates(query, payload.max_results)
+        provider_used, candidates = await asyncio.to_thread(search_art_candidates, query, payload.max_results)
         if not candidates:
             steps.append(step("searching_art", "error", "no image candidates found"))
             return api_response(
@@ -651,8 +807,9 @@ async def search_art(payload: ArtSearchRequest, request: Request):
                 status_code=404,
             )
 
-        cache_key = art_search_cache_key(provider_used, game_id, query, payload.max_results)
-        store_cached_art_search(cache_key, candidates, now_ts)
+        if provider_used != provider_name:
+            cache_key = art_search_cache_key(provider_used, game_id, query, payload.max_results)
+        await asyncio.to_thread(store_cached_art_search, cache_key, candidates, now_ts)
         steps.append(step("searching_art", "success", "art candidates found", {"count": len(candidates)}))
         return api_response(
             status="success",
@@ -718,11 +875,13 @@ async def upload_art_manual(
     ico: Optional[UploadFile] = File(None),
     lab: Optional[UploadFile] = File(None),
 ):
-    steps: list[dict[str, Any]] = []
+    steps: list[Step] = []
     try:
         target = resolve_target(target_path)
-        normalized_game_id, generated, id_source = resolve_game_id_for_target(target, game_name.strip(), source_filename.strip())
-        ok, reason = validate_target_access(target)
+        normalized_game_id, generated, id_source = await asyncio.to_thread(
+            resolve_game_id_for_target, target, game_name.strip(), source_filename.strip()
+        )
+        ok, reason = await asyncio.to_thread(validate_target_access, target)
         if not ok:
             return api_response(
                 status="error",
@@ -734,25 +893,25 @@ async def upload_art_manual(
                 status_code=400,
             )
 
-        ensure_required_folders(target)
+        await asyncio.to_thread(ensure_required_folders, target)
         art_dir = target / "ART"
 
-        uploads = {
-            "COV": cov,
-            "COV2": cov2,
-            "BG": bg,
-            "SCR": scr,
-            "SCR2": scr2,
-            "LGO": lgo,
-            "ICO": ico,
-            "LAB": lab,
-        }
-
-        saved: list[dict[str, Any]] = []
-        for art_type, upload in uploads.items():
+        uploads = (
+            ("COV", cov),
+            ("COV2", cov2),
+            ("BG", bg),
+            ("SCR", scr),
+            ("SCR2", scr2),
+            ("LGO", lgo),
+            ("ICO", ico),
+            ("LAB", lab),
+        )
+
+        selected: list[tuple[str, UploadFile, str]] = []
+        for art_type, upload in uploads:
             if not upload or not upload.filename:
                 continue
-            src_ext = Path(upload.filename).suffix.lower()
+            src_ext = os.path.splitext(upload.filename)[1].lower()
             if src_ext not in ART_ALLOWED_EXT:
                 return api_response(
                     status="error",
@@ -763,16 +922,9 @@ async def upload_art_manual(
                     steps=steps,
                     status_code=400,
                 )
+            selected.append((art_type, upload, src_ext))
 
-            raw_content = await upload.read()
-            optimized_content, dst_ext, optimize_info = optimize_art_image(raw_content, art_type, src_ext)
-            dst = art_dir / f"{normalized_game_id}_{art_type}{dst_ext}"
-            with dst.open("wb") as fh:
-                fh.write(optimized_content)
-            await upload.close()
-            saved.append({"art_type": art_type, "path": str(dst), "optimize": optimize_info})
-
-        if not saved:
+        if not selected:
             return api_response(
                 status="error",
                 state="failed",
@@ -783,6 +935,24 @@ async def upload_art_manual(
                 status_code=400,
             )
 
+        async def save_upload(art_type: str, upload: UploadFile, src_ext: str) -> dict[str, Any]:
+            raw_content = await upload.read()
+            optimized_content, dst_ext, optimize_info = await asyncio.to_thread(
+                optimize_art_image, raw_content, art_type, src_ext
+            )
+            dst = art_dir / f"{normalized_game_id}_{art_type}{dst_ext}"
+            await asyncio.to_thread(dst.write_bytes, optimized_content)
+            return {"art_type": art_type, "path": str(dst), "optimize": optimize_info}
+
+        # Pillow drops the GIL while decoding, resizing and encoding, so the art types optimize in parallel.
+        results = await asyncio.gather(
+            *(save_upload(art_type, upload, src_ext) for art_type, upload, src_ext in selected),
+            return_exceptions=True,
+        )
+        saved, failed = _split_art_results([art_type for art_type, _, _ in selected], results)
+        if failed:
+            return _art_save_failed("manual art upload failed", saved, failed, steps)
+
         return api_response(
             status="success",
             state="completed",
@@ -816,14 +986,17 @@ async def upload_art_manual(
             steps=steps,
             status_code=500,
         )
+    finally:
+        await _close_uploads((cov, cov2, bg, scr, scr2, lgo, ico, lab))
 
 
 @router.post("/api/art/save-auto")
 async def save_art_auto(payload: ArtSaveRequest):
-    steps: list[dict[str, Any]] = []
+    steps: list[Step] = []
     try:
         target = resolve_target(payload.target_path)
-        game_id, generated, id_source = resolve_game_id_for_target(
+        game_id, generated, id_source = await asyncio.to_thread(
+            resolve_game_id_for_target,
             target,
             (payload.game_name or "").strip(),
             (payload.source_filename or "").strip(),
@@ -839,7 +1012,7 @@ async def save_art_auto(payload: ArtSaveRequest):
                 status_code=400,
             )
 
-        ok, reason = validate_target_access(target)
+        ok, reason = await asyncio.to_thread(validate_target_access, target)
         if not ok:
             return api_response(
                 status="error",
@@ -850,15 +1023,14 @@ async def save_art_auto(payload: ArtSaveRequest):
                 steps=steps,
                 status_code=400,
             )
-        ensure_required_folders(target)
+        await asyncio.to_thread(ensure_required_folders, target)
         art_dir = target / "ART"
 
-        seen_types: set[str] = set()
         skipped_duplicates: list[dict[str, Any]] = []
-        unique_selections = []
+        unique_selections: dict[str, str] = {}
         for idx, selection in enumerate(payload.selections, start=1):
             art_type = selection.art_type.strip().upper()
-            if art_type not in ART_TYPES:
+            if art_type not in ART_TYPE_SET:
                 return api_response(
                     status="error",
                     state="failed",
@@ -868,11 +1040,10 @@ async def save_art_auto(payload: ArtSaveRequest):
                     steps=steps,
                     status_code=400,
                 )
-            if art_type in seen_types:
+            if art_type in unique_selections:
                 skipped_duplicates.append({"art_type": art_type, "position": idx})
                 continue
-            seen_types.add(art_type)
-            unique_selections.append(selection)
+            unique_selections[art_type] = selection.image_url.strip()
 
         if not unique_selections:
             return api_response(
@@ -885,15 +1056,25 @@ async def save_art_auto(payload: ArtSaveRequest):
                 status_code=400,
             )
 
-        saved: list[dict[str, Any]] = []
-        for selection in unique_selections:
-            art_type = selection.art_type.strip().upper()
-            content, ext = download_image(selection.image_url.strip(), art_type)
-            optimized_content, optimized_ext, optimize_info = optimize_art_image(content, art_type, ext)
+        download_limit = asyncio.Semaphore(ART_DOWNLOAD_CONCURRENCY)
+
+        async def save_selection(art_type: str, image_url: str) -> dict[str, Any]:
+            # Each image is optimized as soon as it arrives, overlapping with the remaining downloads.
+            content, ext = await _download_art(download_limit, image_url, art_type)
+            optimized_content, optimized_ext, optimize_info = await asyncio.to_thread(
+                optimize_art_image, content, art_type, ext
+            )
             destination = art_dir / f"{game_id}_{art_type}{optimized_ext}"
-            with destination.open("wb") as fh:
-                fh.write(optimized_content)
-            saved.append({"art_type": art_type, "path": str(destination), "optimize": optimize_info})
+            await asyncio.to_thread(destination.write_bytes, optimized_content)
+            return {"art_type": art_type, "path": str(destination), "optimize": optimize_info}
+
+        results = await asyncio.gather(
+            *(save_selection(art_type, image_url) for art_type, image_url in unique_selections.items()),
+            return_exceptions=True,
+        )
+        saved, failed = _split_art_results(list(unique_selections), results)
+        if failed:
+            return _art_save_failed("auto art save failed", saved, failed, steps)
 
         return api_response(
             status="success",
@@ -937,23 +1118,27 @@ async def import_iso(
     overwrite: bool = Form(False),
     files: list[UploadFile] = File(...),
 ):
-    steps: list[dict[str, Any]] = []
+    steps: list[Step] = []
     tmp_dir: Optional[str] = None
     prepared_files: list[dict[str, Any]] = []
+    target: Optional[Path] = None
+    # Manifest updates are written once per import; copies that finished before a failure are flushed in finally.
+    manifest_records: list[dict[str, str]] = []
 
     try:
         steps.append(step("initializing", "info", "starting import job"))
         target = resolve_target(target_path)
+        target_str = str(target)
 
-        steps.append(step("validating_target", "info", "checking target path", {"target": str(target)}))
-        ok, reason = validate_target_access(target)
+        steps.append(step("validating_target", "info", "checking target path", {"target": target_str}))
+        ok, reason = await asyncio.to_thread(validate_target_access, target)
         if not ok:
             steps.append(step("validating_target", "error", reason))
             return api_response(
                 status="error",
                 state="failed",
                 message="target validation failed",
-                details={"target": str(target), "reason": reason},
+                details={"target": target_str, "reason": reason},
                 next_action="fix_target_path_or_permissions",
                 steps=steps,
                 status_code=400,
@@ -961,7 +1146,7 @@ async def import_iso(
 
         steps.append(step("ensuring_structure", "info", "ensuring required folders"))
         try:
-            missing, created = ensure_required_folders(target)
+            missing, created = await asyncio.to_thread(ensure_required_folders, target)
         except NotADirectoryError as exc:
             steps.append(step("ensuring_structure", "error", str(exc)))
             return api_response(
@@ -995,7 +1180,11 @@ async def import_iso(
             )
 
         steps.append(step("validating_files", "info", "validating and staging uploads"))
-        tmp_dir = tempfile.mkdtemp(prefix="ps2_iso_import_")
+        tmp_dir = tempfile.mkdtemp(prefix="ps2_iso_import_", dir=IMPORT_STAGING_DIR)
+        # tmp_dir starts empty, so staged names can be tracked in memory instead of probed on disk.
+        staged_names: set[str] = set()
+        tmp_root = Path(tmp_dir)
+        total_iso_bytes = 0
 
         for upload in files:
             original_name = Path(upload.filename or "").name
@@ -1011,7 +1200,8 @@ async def import_iso(
                     status_code=400,
                 )
 
-            if Path(original_name).suffix.lower() != ".iso":
+            original_stem, original_ext = os.path.splitext(original_name)
+            if original_ext.lower() != ".iso":
                 steps.append(step("validating_files", "error", "non-iso file detected", {"file": original_name}))
                 return api_response(
                     status="error",
@@ -1023,32 +1213,62 @@ async def import_iso(
                     status_code=400,
                 )
 
-            staged_path = Path(tmp_dir) / original_name
-            if staged_path.exists():
-                base = staged_path.stem
-                suffix = staged_path.suffix
+            if upload.size == 0:
+                steps.append(step("validating_files", "error", "uploaded file is empty", {"file": original_name}))
+                return api_response(
+                    status="error",
+                    state="failed",
+                    message="uploaded file is empty",
+                    details={"file": original_name},
+                    next_action="remove_empty_files",
+                    steps=steps,
+                    status_code=400,
+                )
+
+            staged_name = original_name
+            if staged_name in staged_names:
                 counter = 1
-                while True:
-                    candidate = Path(tmp_dir) / f"{base}_{counter}{suffix}"
-                    if not candidate.exists():
-                        staged_path = candidate
-                        break
+                while f"{original_stem}_{counter}{original_ext}" in staged_names:
                     counter += 1
+                staged_name = f"{original_stem}_{counter}{original_ext}"
+            staged_names.add(staged_name)
+            staged_path = tmp_root / staged_name
 
-            with staged_path.open("wb") as temp_file:
-                shutil.copyfileobj(upload.file, temp_file)
+            try:
+                file_size = await asyncio.to_thread(_stage_upload, upload, staged_path)
+            except OSError as exc:
+                # Only a full target drive (IMPORT_STAGING_DIR on it) is the user's to fix; other staging errors stay 500s.
+                if exc.errno != errno.ENOSPC or not await asyncio.to_thread(same_filesystem, tmp_root, target):
+                    raise
+                steps.append(step("checking_space", "error", "target ran out of space while staging", {"file": original_name}))
+                return api_response(
+                    status="error",
+                    state="failed",
+                    message="insufficient disk space",
+                    details={"target": target_str, "file": original_name},
+                    next_action="free_up_space_then_retry",
+                    steps=steps,
+                    status_code=400,
+                )
+            total_iso_bytes += file_size
 
             try:
                 inferred_game_name = derive_game_name(None, original_name)
             except ValueError:
-                inferred_game_name = Path(original_name).stem
-            iso_game_id = extract_game_id_from_iso(staged_path)
-            if iso_game_id:
-                resolved_game_id = iso_game_id
-                id_source = "iso"
+                inferred_game_name = original_stem
+            # A valid ID prefix in the filename makes reading SYSTEM.CNF from the ISO unnecessary.
+            filename_game_id = extract_game_id_from_filename(original_name)
+            if filename_game_id:
+                resolved_game_id = filename_game_id
+                id_source = "filename"
             else:
-                resolved_game_id, _ = resolve_game_id(None, inferred_game_name)
-                id_source = "generated"
+                iso_game_id = await asyncio.to_thread(extract_game_id_from_iso, staged_path)
+                if iso_game_id:
+                    resolved_game_id = iso_game_id
+                    id_source = "iso"
+                else:
+                    resolved_game_id, _ = resolve_game_id(None, inferred_game_name)
+                    id_source = "generated"
 
             normalized_original_name = build_opl_iso_filename(
                 game_id=resolved_game_id,
@@ -1056,7 +1276,6 @@ async def import_iso(
                 game_name=inferred_game_name,
             )
 
-            file_size = staged_path.stat().st_size
             prepared_files.append(
                 {
                     "name": normalized_original_name,
@@ -1069,9 +1288,10 @@ async def import_iso(
                     "target_folder": "CD" if file_size < CD_THRESHOLD_BYTES else "DVD",
                 }
             )
-            await upload.close()
 
-        total_iso_bytes = sum(f["size"] for f in prepared_files)
+        # Closing deletes Starlette's spooled copies; the staged files are all the copy phase needs.
+        await _close_uploads(files)
+
         if total_iso_bytes == 0:
             steps.append(step("validating_files", "error", "uploaded files are empty"))
             return api_response(
@@ -1098,10 +1318,14 @@ async def import_iso(
         )
 
         steps.append(step("checking_space", "info", "checking available disk space"))
-        usage = shutil.disk_usage(target)
+        target_free_bytes = await asyncio.to_thread(free_space, target)
+        space_checked_ts = time.monotonic()
         buffer_bytes = compute_buffer(total_iso_bytes)
         required_bytes = total_iso_bytes + buffer_bytes
-        free_bytes = usage.free
+        # Staged files on the target's file system already occupy their space and are later renamed
+        # into place, so they count toward what is available rather than against it.
+        stage_on_target_fs = await asyncio.to_thread(same_filesystem, tmp_root, target)
+        free_bytes = target_free_bytes + (total_iso_bytes if stage_on_target_fs else 0)
 
         if free_bytes < required_bytes:
             deficit = required_bytes - free_bytes
@@ -1122,7 +1346,7 @@ async def import_iso(
                 state="failed",
                 message="insufficient disk space",
                 details={
-                    "target": str(target),
+                    "target": target_str,
                     "required": human_bytes(required_bytes),
                     "free": human_bytes(free_bytes),
                     "deficit": human_bytes(deficit),
@@ -1151,97 +1375,208 @@ async def import_iso(
         # Copy larger files first to reduce FAT32 fragmentation risk.
         prepared_files.sort(key=lambda item: int(item["size"]), reverse=True)
 
-        for item in prepared_files:
-            if not target.exists():
-                steps.append(step("importing", "error", "target path disappeared during import"))
-                return api_response(
+        import_limit = asyncio.Semaphore(IMPORT_PARALLELISM)
+        space_lock = asyncio.Lock()
+        # Uploads that map to the same destination must still be copied one after another.
+        destination_locks: dict[Path, asyncio.Lock] = {}
+        failures: list[ORJSONResponse] = []
+
+        folder_paths = {folder: target / folder for folder in ("CD", "DVD")}
+        # At most IMPORT_PARALLELISM buffers exist; each is reused by later copies in the batch.
+        copy_buffers: list[bytearray] = []
+        # Cleared after the first EXDEV so the rest of the batch goes straight to copying.
+        rename_into_place = stage_on_target_fs
+        remaining_bytes = total_iso_bytes
+        # Free space is estimated from the last probe minus what this import has written since.
+        # It is re-probed every DISK_PROBE_INTERVAL_SEC, or early if the estimate looks too low.
+        last_probe_ts = space_checked_ts
+        probed_free_bytes = target_free_bytes
+        copied_since_probe = 0
+
+        def record_target_gone() -> None:
+            invalidate_target_cache(target)
+            steps.append(step("importing", "error", "target path disappeared during import"))
+            failures.append(
+                api_response(
                     status="error",
                     state="failed",
                     message="target path disappeared during import",
-                    details={"target": str(target)},
+                    details={"target": target_str},
                     next_action="reconnect_target_and_retry",
                     steps=steps,
                     status_code=400,
                 )
+            )
 
-            destination = target / item["target_folder"] / item["name"]
-            if destination.exists() and not overwrite:
-                steps.append(
-                    step(
-                        "importing",
-                        "error",
-                        "destination file already exists",
-                        {"file": item["name"], "destination": str(destination)},
+        async def import_item(item: dict[str, Any]) -> None:
+            try:
+                await copy_item(item)
+            except Exception as exc:  # noqa: BLE001
+                # Recorded like any other failure: queued items then skip, and gather still waits for
+                # in-flight copies, so nothing touches the staging dir after the finally cleanup.
+                if not await asyncio.to_thread(os.path.isdir, target):
+                    # An unplugged drive surfaces mid-copy as EIO/ENOENT; report it as such, not as a 500.
+                    record_target_gone()
+                    return
+                steps.append(step("importing", "error", "failed to import file", {"file": item["name"], "error": str(exc)}))
+                failures.append(
+                    api_response(
+                        status="error",
+                        state="failed",
+                        message="unexpected error during import",
+                        details={"file": item["name"], "error": str(exc)},
+                        next_action="retry",
+                        steps=steps,
+                        status_code=500,
                     )
                 )
-                return api_response(
-                    status="error",
-                    state="failed",
-                    message="destination file already exists",
-                    details={"file": item["name"], "destination": str(destination), "overwrite": False},
-                    next_action="enable_overwrite_or_rename_file",
-                    steps=steps,
-                    status_code=409,
-                )
 
-            imported_names = {i["file"] for i in imported}
-            remaining_bytes = sum(f["size"] for f in prepared_files if f["name"] not in imported_names)
-            usage = shutil.disk_usage(target)
-            dynamic_required = remaining_bytes + compute_buffer(remaining_bytes)
-            if usage.free < dynamic_required:
-                steps.append(
-                    step(
-                        "importing",
-                        "error",
-                        "disk space dropped during import",
-                        {
-                            "file": item["name"],
-                            "required": human_bytes(dynamic_required),
-                            "free": human_bytes(usage.free),
-                        },
+        async def copy_to_destination(item: dict[str, Any], destination: Path) -> None:
+            buffer = copy_buffers.pop() if copy_buffers else bytearray(COPY_BUFSIZE)
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    COPY_EXECUTOR, fast_copy, item["staged_path"], destination, buffer
+                )
+            except BaseException:
+                # A truncated ISO would still show up in OPL's game list.
+                with contextlib.suppress(OSError):
+                    await asyncio.to_thread(destination.unlink, missing_ok=True)
+                raise
+            finally:
+                copy_buffers.append(buffer)
+
+        async def copy_item(item: dict[str, Any]) -> None:
+            nonlocal remaining_bytes, last_probe_ts, probed_free_bytes, copied_since_probe, rename_into_place
+            destination = folder_paths[item["target_folder"]] / item["name"]
+            destination_str = str(destination)
+            async with import_limit, destination_locks.setdefault(destination, asyncio.Lock()):
+                if failures:
+                    return
+                async with space_lock:
+                    target_present = True
+                    dynamic_required = remaining_bytes + compute_buffer(remaining_bytes)
+                    staged_credit = remaining_bytes if stage_on_target_fs else 0
+                    free_bytes = probed_free_bytes - copied_since_probe + staged_credit
+                    now_ts = time.monotonic()
+                    if now_ts - last_probe_ts >= DISK_PROBE_INTERVAL_SEC or free_bytes < dynamic_required:
+                        try:
+                            probed = await asyncio.to_thread(free_space, target)
+                        except FileNotFoundError:
+                            target_present = False
+                        else:
+                            last_probe_ts = now_ts
+                            probed_free_bytes = probed
+                            copied_since_probe = 0
+                            free_bytes = probed + staged_credit
+                if not target_present:
+                    record_target_gone()
+                    return
+
+                if not overwrite and await asyncio.to_thread(destination.exists):
+                    steps.append(
+                        step(
+                            "importing",
+                            "error",
+                            "destination file already exists",
+                            {"file": item["name"], "destination": destination_str},
+                        )
                     )
+                    failures.append(
+                        api_response(
+                            status="error",
+                            state="failed",
+                            message="destination file already exists",
+                            details={"file": item["name"], "destination": destination_str, "overwrite": False},
+                            next_action="enable_overwrite_or_rename_file",
+                            steps=steps,
+                            status_code=409,
+                        )
+                    )
+                    return
+
+                if free_bytes < dynamic_required:
+                    steps.append(
+                        step(
+                            "importing",
+                            "error",
+                            "disk space dropped during import",
+                            {
+                                "file": item["name"],
+                                "required": human_bytes(dynamic_required),
+                                "free": human_bytes(free_bytes),
+                            },
+                        )
+                    )
+                    failures.append(
+                        api_response(
+                            status="error",
+                            state="failed",
+                            message="disk space dropped during import",
+                            details={"file": item["name"]},
+                            next_action="free_up_space_then_retry",
+                            steps=steps,
+                            status_code=400,
+                        )
+                    )
+                    return
+
+                renamed = False
+                if rename_into_place:
+                    # Same file system: a rename moves no bytes.
+                    try:
+                        await asyncio.to_thread(os.replace, item["staged_path"], destination)
+                        renamed = True
+                    except OSError as exc:
+                        # Bind mounts of one disk share st_dev, yet rename(2) still refuses to cross mount points.
+                        if exc.errno != errno.EXDEV:
+                            raise
+                        rename_into_place = False
+                if not renamed:
+                    await copy_to_destination(item, destination)
+                    copied_since_probe += item["size"]
+                    if stage_on_target_fs:
+                        # The staged copy sits on the target too; dropping it hands back the bytes just written.
+                        with contextlib.suppress(OSError):
+                            await asyncio.to_thread(os.unlink, item["staged_path"])
+                            copied_since_probe -= item["size"]
+                remaining_bytes -= item["size"]
+                manifest_records.append(
+                    {
+                        "source_filename": item["source_filename"],
+                        "game_name": item["game_name"],
+                        "game_id": item["game_id"],
+                        "id_source": item["id_source"],
+                        "target_folder": item["target_folder"],
+                        "destination_filename": item["name"],
+                    }
                 )
-                return api_response(
-                    status="error",
-                    state="failed",
-                    message="disk space dropped during import",
-                    details={"file": item["name"]},
-                    next_action="free_up_space_then_retry",
-                    steps=steps,
-                    status_code=400,
+                imported.append(
+                    {
+                        "file": item["name"],
+                        "source_filename": item["source_filename"],
+                        "game_name": item["game_name"],
+                        "game_id": item["game_id"],
+                        "id_source": item["id_source"],
+                        "target_folder": item["target_folder"],
+                        "destination": destination_str,
+                        "size": human_bytes(item["size"]),
+                    }
                 )
+                steps.append(step("importing", "success", "file copied", {"file": item["name"], "destination": destination_str}))
 
-            shutil.copy2(item["staged_path"], destination)
-            upsert_manifest_entry(
-                target=target,
-                source_filename=item["source_filename"],
-                game_name=item["game_name"],
-                game_id=item["game_id"],
-                id_source=item["id_source"],
-                target_folder=item["target_folder"],
-                destination_filename=item["name"],
-            )
-            imported.append(
-                {
-                    "file": item["name"],
-                    "source_filename": item["source_filename"],
-                    "game_name": item["game_name"],
-                    "game_id": item["game_id"],
-                    "id_source": item["id_source"],
-                    "target_folder": item["target_folder"],
-                    "destination": str(destination),
-                    "size": human_bytes(item["size"]),
-                }
-            )
-            steps.append(step("importing", "success", "file copied", {"file": item["name"], "destination": str(destination)}))
+        await asyncio.gather(*(import_item(item) for item in prepared_files))
+        if failures:
+            return failures[0]
 
+        await asyncio.to_thread(upsert_manifest_entries, target, manifest_records)
+        manifest_records = []
         steps.append(step("completed", "success", "import completed"))
         return api_response(
             status="success",
             state="completed",
             message="all files imported successfully",
             details={
-                "target": str(target),
+                "target": target_str,
                 "imported_count": len(imported),
                 "imported": imported,
                 "manifest_path": str(manifest_path(target)),
@@ -1261,5 +1596,12 @@ async def import_iso(
             status_code=500,
         )
     finally:
-        if tmp_dir and Path(tmp_dir).exists():
-            shutil.rmtree(tmp_dir, ignore_errors=True)
+        # Covers early returns and errors during staging; closing twice is a no-op.
+        await _close_uploads(files)
+        if target and manifest_records:
+            try:
+                await asyncio.to_thread(upsert_manifest_entries, target, manifest_records)
+            except Exception:  # noqa: BLE001
+                pass
+        if tmp_dir:
+            await asyncio.to_thread(shutil.rmtree, tmp_dir, ignore_errors=True)
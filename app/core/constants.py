@@ -2,11 +2,27 @@ from __future__ import annotations
 
 import os
 
-REQUIRED_FOLDERS = ["APPS", "ART", "CD", "CFG", "CHT", "DVD", "LNG", "POPS", "THM", "VMC"]
+# Kept in sorted order so responses can report it as-is.
+REQUIRED_FOLDERS = ("APPS", "ART", "CD", "CFG", "CHT", "DVD", "LNG", "POPS", "THM", "VMC")
+REQUIRED_FOLDER_SET = frozenset(REQUIRED_FOLDERS)
 CD_THRESHOLD_BYTES = 700 * 1024 * 1024
 SPACE_BUFFER_MIN_BYTES = 500 * 1024 * 1024
-SPACE_BUFFER_RATIO = 0.05
+# 5% headroom as an exact fraction, so multi-GB totals never pick up float rounding.
+SPACE_BUFFER_NUM = 1
+SPACE_BUFFER_DEN = 20
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+COPY_BUFSIZE = int(os.getenv("COPY_BUFSIZE", str(4 * 1024 * 1024)))
+# OPL needs contiguous ISOs on FAT32 USB drives; concurrent copies interleave clusters, so keep 1 there.
+IMPORT_PARALLELISM = max(1, int(os.getenv("IMPORT_PARALLELISM", "1")))
+# Where uploads are staged before import; a folder on the target's file system turns the copy into a rename.
+IMPORT_STAGING_DIR = os.getenv("IMPORT_STAGING_DIR", "").strip() or None
+DISK_PROBE_INTERVAL_SEC = float(os.getenv("DISK_PROBE_INTERVAL_SEC", "2.0"))
+# "sha1" keeps generated IDs stable with existing libraries; "blake2b" is faster but yields different IDs.
+GENERATED_ID_HASH = os.getenv("GENERATED_ID_HASH", "sha1").strip().lower()
+TARGET_CACHE_TTL_SEC = float(os.getenv("TARGET_CACHE_TTL_SEC", "1.0"))
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "false").strip().lower() in {"1", "true", "yes", "on"}
 ART_TYPES = ["COV", "COV2", "BG", "SCR", "SCR2", "LGO", "ICO", "LAB"]
+ART_TYPE_SET = frozenset(ART_TYPES)
 ART_EXT_HINT = {
     "COV": ".jpg",
     "COV2": ".jpg",
@@ -17,9 +33,16 @@ ART_EXT_HINT = {
     "ICO": ".png",
     "LAB": ".jpg",
 }
-ART_ALLOWED_EXT = {".jpg", ".jpeg", ".png"}
+ART_ALLOWED_EXT = frozenset({".jpg", ".jpeg", ".png"})
 RAWG_SEARCH_ENDPOINT = "https://api.rawg.io/api/games"
+ART_DOWNLOAD_CONCURRENCY = 4
+ART_DOWNLOAD_MAX_BYTES = 20 * 1024 * 1024
+ART_DOWNLOAD_CHUNK_BYTES = 64 * 1024
 ART_SEARCH_CACHE_TTL_SEC = int(os.getenv("ART_SEARCH_CACHE_TTL_SEC", "1800"))
 ART_SEARCH_CACHE_MAX_SIZE = int(os.getenv("ART_SEARCH_CACHE_MAX_SIZE", "200"))
+# Expired entries are still served for this long while a background refresh runs.
+ART_SEARCH_CACHE_STALE_SEC = int(os.getenv("ART_SEARCH_CACHE_STALE_SEC", "86400"))
+# SQLite file that keeps search results across restarts; empty disables persistence.
+ART_SEARCH_CACHE_DB = os.getenv("ART_SEARCH_CACHE_DB", "app/.cache/art_search.sqlite3").strip()
 ART_SEARCH_RATE_LIMIT_PER_MIN = int(os.getenv("ART_SEARCH_RATE_LIMIT_PER_MIN", "30"))
 ART_SEARCH_MIN_INTERVAL_SEC = float(os.getenv("ART_SEARCH_MIN_INTERVAL_SEC", "1.5"))
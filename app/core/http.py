@@ -1,19 +1,22 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Any, Optional
 
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 
-def step(state: str, status: str, message: str, details: Optional[dict[str, Any]] = None) -> dict[str, Any]:
-    payload: dict[str, Any] = {
-        "state": state,
-        "status": status,
-        "message": message,
-    }
-    if details:
-        payload["details"] = details
-    return payload
+@dataclass(slots=True)
+class Step:
+    # orjson serializes slotted dataclasses natively, so steps never become intermediate dicts.
+    state: str
+    status: str
+    message: str
+    details: Optional[dict[str, Any]] = None
+
+
+def step(state: str, status: str, message: str, details: Optional[dict[str, Any]] = None) -> Step:
+    return Step(state, status, message, details or None)
 
 
 def api_response(
@@ -22,10 +25,10 @@ def api_response(
     message: str,
     details: Optional[dict[str, Any]] = None,
     next_action: Optional[str] = None,
-    steps: Optional[list[dict[str, Any]]] = None,
+    steps: Optional[list[Step]] = None,
     status_code: int = 200,
-) -> JSONResponse:
-    return JSONResponse(
+) -> ORJSONResponse:
+    return ORJSONResponse(
         status_code=status_code,
         content={
             "status": status,
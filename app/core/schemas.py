@@ -2,44 +2,49 @@ from __future__ import annotations
 
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
-class ValidateTargetRequest(BaseModel):
+class RequestModel(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+
+class ValidateTargetRequest(RequestModel):
     target_path: str = Field(min_length=1)
     ensure_folders: bool = True
 
 
-class FormatTargetRequest(BaseModel):
+class FormatTargetRequest(RequestModel):
     target_path: str = Field(min_length=1)
     confirm_phrase: str = Field(min_length=1)
     volume_label: str = "PS2USB"
 
 
-class ArtSearchRequest(BaseModel):
+class ArtSearchRequest(RequestModel):
     target_path: Optional[str] = None
     game_name: Optional[str] = None
     source_filename: Optional[str] = None
     max_results: int = Field(default=10, ge=1, le=10)
 
 
-class ArtSelection(BaseModel):
+class ArtSelection(RequestModel):
     art_type: str = Field(min_length=1)
     image_url: str = Field(min_length=1)
 
 
-class ArtSaveRequest(BaseModel):
+class ArtSaveRequest(RequestModel):
     target_path: str = Field(min_length=1)
     game_name: Optional[str] = None
     source_filename: Optional[str] = None
-    selections: list[ArtSelection]
+    # One selection per art type is enough; the cap keeps hostile payloads from growing unbounded lists.
+    selections: list[ArtSelection] = Field(max_length=16)
 
 
-class ScanGamesRequest(BaseModel):
+class ScanGamesRequest(RequestModel):
     target_path: str = Field(min_length=1)
 
 
-class DeleteGameRequest(BaseModel):
+class DeleteGameRequest(RequestModel):
     target_path: str = Field(min_length=1)
     game_id: str = Field(min_length=1)
     destination_filename: Optional[str] = None
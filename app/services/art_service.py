@@ -1,32 +1,71 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import contextlib
+import functools
+import http.client
 import os
+import sqlite3
 import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from io import BytesIO
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
+
+import orjson
 from PIL import Image
 
 from app.core.constants import (
     ART_ALLOWED_EXT,
+    ART_DOWNLOAD_CHUNK_BYTES,
+    ART_DOWNLOAD_MAX_BYTES,
     ART_EXT_HINT,
+    ART_SEARCH_CACHE_DB,
     ART_SEARCH_CACHE_MAX_SIZE,
+    ART_SEARCH_CACHE_STALE_SEC,
     ART_SEARCH_CACHE_TTL_SEC,
     ART_SEARCH_MIN_INTERVAL_SEC,
     ART_SEARCH_RATE_LIMIT_PER_MIN,
     RAWG_SEARCH_ENDPOINT,
 )
 
-_ART_SEARCH_CACHE: dict[str, dict[str, Any]] = {}
-_ART_SEARCH_CLIENT_LIMITS: dict[str, dict[str, Any]] = {}
-_ART_SEARCH_LOCK = threading.Lock()
 
+@dataclass(slots=True)
+class _ClientLimit:
+    window_start: float
+    count: int = 0
+    last_ts: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock)
 
+
+_ART_SEARCH_CACHE: OrderedDict[str, dict[str, Any]] = OrderedDict()
+_ART_SEARCH_CLIENT_LIMITS: dict[str, _ClientLimit] = {}
+# Clients idle this long have no window or interval left to enforce and can be forgotten.
+_ART_SEARCH_CLIENT_IDLE_SEC = 300
+_ART_SEARCH_CLIENT_PRUNE_AT = 256
+# The cache and the per-client limiter use separate locks so lookups never wait on rate-limit bookkeeping.
+_ART_SEARCH_LOCK = threading.Lock()
+_ART_SEARCH_CLIENTS_LOCK = threading.Lock()
+_ART_SEARCH_DB_READY = False
+_ART_SEARCH_REFRESHING: set[str] = set()
+_ART_SEARCH_TASKS: set[asyncio.Task[None]] = set()
+_HTTP_HEADERS = {"User-Agent": "PS2-ISO-Importer/1.0"}
+_HTTP_URL_PREFIXES = ("http://", "https://")
+_HTTP_REDIRECTS = frozenset({301, 302, 303, 307, 308})
+_HTTP_MAX_REDIRECTS = 3
+# One keep-alive connection per host and worker thread, so repeat RAWG/CDN hits skip the TLS handshake.
+# Least recently used hosts are closed past the cap, so one-off image hosts don't pile up in CLOSE_WAIT.
+_HTTP_CONNECTIONS = threading.local()
+_HTTP_POOL_MAX_HOSTS = 4
+
+
+# Exceptions are not cached, so a missing key is re-read until one is configured.
+@functools.lru_cache(maxsize=1)
 def rawg_api_key() -> str:
     key = os.getenv("RAWG_API_KEY", "").strip()
     if not key:
@@ -34,55 +73,240 @@ def rawg_api_key() -> str:
     return key
 
 
+def build_art_search_query(game_query: str) -> str:
+    # Normalized once so the cache key and the RAWG request share the same text.
+    return " ".join(game_query.lower().split()) + " ps2 cover art"
+
+
 def art_search_cache_key(provider: str, game_id: str, query: str, max_results: int) -> str:
     return f"{provider}|{game_id}|{query.lower()}|{max_results}"
 
 
-def get_cached_art_search(cache_key: str, now_ts: float) -> Optional[list[dict[str, Any]]]:
+def _art_cache_db() -> Optional[sqlite3.Connection]:
+    global _ART_SEARCH_DB_READY
+    if not ART_SEARCH_CACHE_DB:
+        return None
+    db_file = Path(ART_SEARCH_CACHE_DB)
+    try:
+        if not _ART_SEARCH_DB_READY:
+            db_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_file, timeout=5)
+        if not _ART_SEARCH_DB_READY:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS art_search_cache ("
+                "cache_key TEXT PRIMARY KEY, ts REAL NOT NULL, candidates BLOB NOT NULL)"
+            )
+            _ART_SEARCH_DB_READY = True
+        return conn
+    except (OSError, sqlite3.Error):
+        # The persistent layer is an optimization; fall back to memory only.
+        return None
+
+
+def _load_persisted_art_search(cache_key: str) -> Optional[dict[str, Any]]:
+    conn = _art_cache_db()
+    if conn is None:
+        return None
+    try:
+        with conn:
+            row = conn.execute(
+                "SELECT ts, candidates FROM art_search_cache WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        if not row:
+            return None
+        candidates = orjson.loads(row[1])
+        if not isinstance(candidates, list):
+            return None
+        return {"ts": float(row[0]), "candidates": candidates}
+    except (sqlite3.Error, ValueError):
+        return None
+    finally:
+        conn.close()
+
+
+def _persist_art_search(cache_key: str, candidates: list[dict[str, Any]], now_ts: float) -> None:
+    conn = _art_cache_db()
+    if conn is None:
+        return
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO art_search_cache (cache_key, ts, candidates) VALUES (?, ?, ?)",
+                (cache_key, now_ts, orjson.dumps(candidates)),
+            )
+            conn.execute(
+                "DELETE FROM art_search_cache WHERE ts < ?",
+                (now_ts - ART_SEARCH_CACHE_TTL_SEC - ART_SEARCH_CACHE_STALE_SEC,),
+            )
+    except sqlite3.Error:
+        pass
+    finally:
+        conn.close()
+
+
+def _remember_art_search(cache_key: str, entry: dict[str, Any]) -> None:
+    _ART_SEARCH_CACHE[cache_key] = entry
+    _ART_SEARCH_CACHE.move_to_end(cache_key)
+    while len(_ART_SEARCH_CACHE) > ART_SEARCH_CACHE_MAX_SIZE:
+        _ART_SEARCH_CACHE.popitem(last=False)
+
+
+def get_cached_art_search(cache_key: str, now_ts: float) -> tuple[Optional[list[dict[str, Any]]], bool]:
+    """Return ``(candidates, is_stale)``; candidates is None on a miss."""
     with _ART_SEARCH_LOCK:
         entry = _ART_SEARCH_CACHE.get(cache_key)
+    if not entry:
+        # SQLite does its own locking; keep the disk read outside the cache lock.
+        entry = _load_persisted_art_search(cache_key)
         if not entry:
-            return None
-        if now_ts - entry["ts"] > ART_SEARCH_CACHE_TTL_SEC:
-            _ART_SEARCH_CACHE.pop(cache_key, None)
-            return None
-        return entry["candidates"]
+            return None, False
+        with _ART_SEARCH_LOCK:
+            _remember_art_search(cache_key, entry)
+    age = now_ts - entry["ts"]
+    with _ART_SEARCH_LOCK:
+        if age > ART_SEARCH_CACHE_TTL_SEC + ART_SEARCH_CACHE_STALE_SEC:
+            if _ART_SEARCH_CACHE.get(cache_key) is entry:
+                _ART_SEARCH_CACHE.pop(cache_key, None)
+            return None, False
+        if cache_key in _ART_SEARCH_CACHE:
+            _ART_SEARCH_CACHE.move_to_end(cache_key)
+    return entry["candidates"], age > ART_SEARCH_CACHE_TTL_SEC
 
 
 def store_cached_art_search(cache_key: str, candidates: list[dict[str, Any]], now_ts: float) -> None:
     with _ART_SEARCH_LOCK:
-        _ART_SEARCH_CACHE[cache_key] = {"ts": now_ts, "candidates": candidates}
-        if len(_ART_SEARCH_CACHE) > ART_SEARCH_CACHE_MAX_SIZE:
-            oldest_key = min(_ART_SEARCH_CACHE.items(), key=lambda kv: kv[1]["ts"])[0]
-            _ART_SEARCH_CACHE.pop(oldest_key, None)
+        _remember_art_search(cache_key, {"ts": now_ts, "candidates": candidates})
+    _persist_art_search(cache_key, candidates, now_ts)
 
 
-def enforce_art_search_rate_limit(client_id: str, now_ts: float) -> tuple[bool, str, int]:
+async def _refresh_art_search(cache_key: str, query: str, max_results: int) -> None:
+    try:
+        _, candidates = await asyncio.to_thread(search_art_candidates, query, max_results)
+        if candidates:
+            await asyncio.to_thread(store_cached_art_search, cache_key, candidates, time.time())
+    except Exception:
+        # Keep serving the stale entry; the next stale hit retries the refresh.
+        pass
+    finally:
+        with _ART_SEARCH_LOCK:
+            _ART_SEARCH_REFRESHING.discard(cache_key)
+
+
+def schedule_art_search_refresh(cache_key: str, query: str, max_results: int) -> None:
     with _ART_SEARCH_LOCK:
+        if cache_key in _ART_SEARCH_REFRESHING:
+            return
+        _ART_SEARCH_REFRESHING.add(cache_key)
+    task = asyncio.get_running_loop().create_task(_refresh_art_search(cache_key, query, max_results))
+    _ART_SEARCH_TASKS.add(task)
+    task.add_done_callback(_ART_SEARCH_TASKS.discard)
+
+
+def enforce_art_search_rate_limit(client_id: str, now_ts: float) -> tuple[bool, str, int]:
+    with _ART_SEARCH_CLIENTS_LOCK:
         limiter = _ART_SEARCH_CLIENT_LIMITS.get(client_id)
         if not limiter:
-            limiter = {"window_start": now_ts, "count": 0, "last_ts": 0.0}
+            if len(_ART_SEARCH_CLIENT_LIMITS) >= _ART_SEARCH_CLIENT_PRUNE_AT:
+                cutoff = now_ts - _ART_SEARCH_CLIENT_IDLE_SEC
+                for stale_id in [key for key, item in _ART_SEARCH_CLIENT_LIMITS.items() if item.last_ts < cutoff]:
+                    del _ART_SEARCH_CLIENT_LIMITS[stale_id]
+            limiter = _ClientLimit(window_start=now_ts)
             _ART_SEARCH_CLIENT_LIMITS[client_id] = limiter
 
-        if now_ts - float(limiter["window_start"]) >= 60:
-            limiter["window_start"] = now_ts
-            limiter["count"] = 0
+    with limiter.lock:
+        if now_ts - limiter.window_start >= 60:
+            limiter.window_start = now_ts
+            limiter.count = 0
 
-        since_last = now_ts - float(limiter["last_ts"])
+        since_last = now_ts - limiter.last_ts
         if since_last < ART_SEARCH_MIN_INTERVAL_SEC:
             retry_after = max(1, int(ART_SEARCH_MIN_INTERVAL_SEC - since_last + 0.999))
             return False, "too many requests; please slow down", retry_after
 
-        if int(limiter["count"]) >= ART_SEARCH_RATE_LIMIT_PER_MIN:
-            elapsed = now_ts - float(limiter["window_start"])
+        if limiter.count >= ART_SEARCH_RATE_LIMIT_PER_MIN:
+            elapsed = now_ts - limiter.window_start
             retry_after = max(1, int(60 - elapsed + 0.999))
             return False, "rate limit reached for art search", retry_after
 
-        limiter["count"] = int(limiter["count"]) + 1
-        limiter["last_ts"] = now_ts
+        limiter.count += 1
+        limiter.last_ts = now_ts
         return True, "", 0
 
 
+def _http_connection(scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+    pool: Optional[OrderedDict[tuple[str, str], http.client.HTTPConnection]] = getattr(_HTTP_CONNECTIONS, "pool", None)
+    if pool is None:
+        pool = _HTTP_CONNECTIONS.pool = OrderedDict()
+    key = (scheme, netloc)
+    conn = pool.get(key)
+    if conn is None:
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = pool[key] = conn_cls(netloc, timeout=timeout)
+        while len(pool) > _HTTP_POOL_MAX_HOSTS:
+            pool.popitem(last=False)[1].close()
+    else:
+        pool.move_to_end(key)
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _http_request(conn: http.client.HTTPConnection, target: str) -> http.client.HTTPResponse:
+    reused = conn.sock is not None
+    try:
+        conn.request("GET", target, headers=_HTTP_HEADERS)
+        return conn.getresponse()
+    except (http.client.HTTPException, OSError):
+        conn.close()
+        if not reused:
+            raise
+    # The server dropped the idle keep-alive socket; retry once on a fresh one.
+    conn.request("GET", target, headers=_HTTP_HEADERS)
+    return conn.getresponse()
+
+
+@contextlib.contextmanager
+def _http_get(url: str, timeout: float) -> Iterator[Any]:
+    """GET ``url`` and yield the response, raising urllib errors like ``urlopen`` does."""
+    if urllib.request.getproxies():
+        # http.client doesn't speak proxies; keep urlopen's handling for those setups.
+        with urllib.request.urlopen(urllib.request.Request(url, headers=_HTTP_HEADERS), timeout=timeout) as response:
+            yield response
+        return
+
+    for _ in range(_HTTP_MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        # Like urlopen, refuse anything but HTTP(S) to a real host (e.g. a file:// redirect, or an
+        # empty host that http.client would turn into localhost).
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise urllib.error.URLError(f"unsupported url: {url}")
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        conn = _http_connection(parts.scheme, parts.netloc, timeout)
+        try:
+            response = _http_request(conn, target)
+        except (http.client.HTTPException, OSError) as exc:
+            raise urllib.error.URLError(exc) from exc
+        location = response.getheader("Location")
+        if response.status in _HTTP_REDIRECTS and location:
+            # Drain the short redirect body so the connection can be reused.
+            response.read()
+            url = urllib.parse.urljoin(url, location)
+            continue
+        try:
+            if response.status >= 400:
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+            yield response
+        finally:
+            # A partially read body would corrupt the next response on this socket.
+            if not response.isclosed():
+                conn.close()
+        return
+    raise urllib.error.URLError("too many redirects")
+
+
 def search_rawg_images(query: str, max_results: int) -> list[dict[str, Any]]:
     params = urllib.parse.urlencode(
         {
@@ -91,13 +315,9 @@ def search_rawg_images(query: str, max_results: int) -> list[dict[str, Any]]:
             "page_size": max_results,
         }
     )
-    req = urllib.request.Request(
-        f"{RAWG_SEARCH_ENDPOINT}?{params}",
-        headers={"User-Agent": "PS2-ISO-Importer/1.0"},
-    )
     try:
-        with urllib.request.urlopen(req, timeout=20) as response:
-            payload = json.loads(response.read().decode("utf-8"))
+        with _http_get(f"{RAWG_SEARCH_ENDPOINT}?{params}", timeout=20) as response:
+            payload = orjson.loads(response.read())
     except urllib.error.HTTPError as exc:
         raise RuntimeError(f"rawg api error: {exc.code}") from exc
     except urllib.error.URLError as exc:
@@ -109,11 +329,12 @@ def search_rawg_images(query: str, max_results: int) -> list[dict[str, Any]]:
     idx = 1
     for game in results:
         name = str(game.get("name", "")).strip() or "RAWG Game"
-        for image_url in [game.get("background_image"), game.get("background_image_additional")]:
-            image = str(image_url or "").strip()
-            if not image.startswith(("http://", "https://")):
+        for image_url in (game.get("background_image"), game.get("background_image_additional")):
+            # JSON strings arrive as str already; anything else (null, numbers) can't be a URL.
+            if not isinstance(image_url, str):
                 continue
-            if image in seen_urls:
+            image = image_url.strip()
+            if image in seen_urls or not image.startswith(_HTTP_URL_PREFIXES):
                 continue
             seen_urls.add(image)
             candidates.append(
@@ -150,18 +371,31 @@ def guess_ext(image_url: str, content_type: Optional[str], art_type: str) -> str
 
 
 def download_image(image_url: str, art_type: str) -> tuple[bytes, str]:
-    if not image_url.startswith(("http://", "https://")):
+    if not image_url.startswith(_HTTP_URL_PREFIXES):
         raise ValueError("image_url must start with http:// or https://")
 
-    req = urllib.request.Request(image_url, headers={"User-Agent": "PS2-ISO-Importer/1.0"})
-    with urllib.request.urlopen(req, timeout=25) as response:
-        content = response.read()
+    with _http_get(image_url, timeout=25) as response:
         content_type = response.headers.get("Content-Type")
+        try:
+            declared = int(response.headers.get("Content-Length") or 0)
+        except ValueError:
+            declared = 0
+        if declared > ART_DOWNLOAD_MAX_BYTES:
+            raise ValueError("downloaded image is too large")
+
+        # Read in bounded chunks so an oversized or lying response is cut off early.
+        buffer = bytearray()
+        while True:
+            chunk = response.read(ART_DOWNLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            buffer += chunk
+            if len(buffer) > ART_DOWNLOAD_MAX_BYTES:
+                raise ValueError("downloaded image is too large")
+        content = bytes(buffer)
 
     if not content:
         raise ValueError("downloaded image is empty")
-    if len(content) > 20 * 1024 * 1024:
-        raise ValueError("downloaded image is too large")
 
     ext = guess_ext(image_url, content_type, art_type)
     if ext not in {".jpg", ".png"}:
@@ -191,11 +425,17 @@ ART_TARGET_BYTES = {
     "LAB": 50 * 1024,
 }
 
+_JPEG_QUALITY_MAX = 72
+_JPEG_QUALITY_MIN = 48
+# 8-bit PNG modes that can be stored as-is for LGO/ICO.
+_PNG_PASSTHROUGH_MODES = frozenset({"RGBA", "LA", "P", "RGB", "L"})
+
 
 def _flatten_alpha(img: Image.Image) -> Image.Image:
     if img.mode in {"RGBA", "LA"}:
         base = Image.new("RGB", img.size, (0, 0, 0))
-        base.paste(img, mask=img.split()[-1])
+        # Pillow masks with the alpha band of an RGBA/LA mask directly, so no per-channel split is needed.
+        base.paste(img, mask=img)
         return base
     if img.mode == "P":
         return img.convert("RGB")
@@ -204,6 +444,25 @@ def _flatten_alpha(img: Image.Image) -> Image.Image:
     return img
 
 
+def _art_details(
+    art_type: str,
+    source_ext: Optional[str],
+    out_ext: str,
+    content: bytes,
+    optimized: bytes,
+    size: tuple[int, int],
+) -> dict[str, Any]:
+    return {
+        "art_type": art_type,
+        "source_ext": (source_ext or "").lower(),
+        "output_ext": out_ext,
+        "original_bytes": len(content),
+        "optimized_bytes": len(optimized),
+        "width": size[0],
+        "height": size[1],
+    }
+
+
 def optimize_art_image(content: bytes, art_type: str, source_ext: Optional[str] = None) -> tuple[bytes, str, dict[str, Any]]:
     normalized_type = art_type.strip().upper()
     if normalized_type not in ART_EXT_HINT:
@@ -213,8 +472,19 @@ def optimize_art_image(content: bytes, art_type: str, source_ext: Optional[str]
     target_bytes = ART_TARGET_BYTES[normalized_type]
     keep_png = normalized_type in {"LGO", "ICO"}
 
-    with Image.open(BytesIO(content)) as raw_img:
-        img = raw_img.copy()
+    # Left unloaded on purpose: thumbnail() drafts JPEGs to ~2x the target before decoding, and the
+    # in-memory source needs no copy to outlive a file handle.
+    img = Image.open(BytesIO(content))
+    if (
+        keep_png
+        and img.format == "PNG"
+        and img.mode in _PNG_PASSTHROUGH_MODES
+        and img.width <= target_width
+        and img.height <= target_height
+        and len(content) <= target_bytes
+    ):
+        # Already small enough at OPL size; a quantize + zlib level 9 pass would only burn CPU.
+        return content, ".png", _art_details(normalized_type, source_ext, ".png", content, content, img.size)
 
     img.thumbnail((target_width, target_height), Image.Resampling.LANCZOS)
 
@@ -230,8 +500,10 @@ def optimize_art_image(content: bytes, art_type: str, source_ext: Optional[str]
         jpg_img = _flatten_alpha(img)
         best_bytes: Optional[bytes] = None
         best_size: Optional[int] = None
-        for quality in (72, 66, 60, 54, 48):
-            output = BytesIO()
+        quality = _JPEG_QUALITY_MAX
+        while True:
+            output.seek(0)
+            output.truncate()
             jpg_img.save(
                 output,
                 format="JPEG",
@@ -240,26 +512,19 @@ def optimize_art_image(content: bytes, art_type: str, source_ext: Optional[str]
                 progressive=True,
                 subsampling="4:2:0",
             )
-            candidate = output.getvalue()
-            size = len(candidate)
+            size = output.tell()
             if best_size is None or size < best_size:
                 best_size = size
-                best_bytes = candidate
-            if size <= target_bytes:
+                best_bytes = output.getvalue()
+            if size <= target_bytes or quality == _JPEG_QUALITY_MIN:
                 break
+            # JPEG size scales roughly with the square of quality here; jump straight to the estimate.
+            estimate = int(quality * (target_bytes / size) ** 0.5)
+            quality = max(_JPEG_QUALITY_MIN, min(estimate, quality - 6))
         if not best_bytes:
             raise ValueError("failed to optimize image")
         out_ext = ".jpg"
         output = BytesIO(best_bytes)
 
     optimized = output.getvalue()
-    details = {
-        "art_type": normalized_type,
-        "source_ext": (source_ext or "").lower(),
-        "output_ext": out_ext,
-        "original_bytes": len(content),
-        "optimized_bytes": len(optimized),
-        "width": img.width,
-        "height": img.height,
-    }
-    return optimized, out_ext, details
+    return optimized, out_ext, _art_details(normalized_type, source_ext, out_ext, content, optimized, img.size)
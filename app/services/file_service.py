@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import errno
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import RawIOBase
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.core.constants import COPY_BUFSIZE, IMPORT_PARALLELISM
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+# Errors meaning "this kernel/file system can't do that copy", not a real I/O failure.
+_COPY_FALLBACK_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.ENOTSOCK,
+}
+_KERNEL_COPY_CHUNK = 1 << 30
+# FAT/exFAT (and FUSE-mounted NTFS/exFAT) can't reserve space without zero-filling it, so glibc's
+# posix_fallocate fallback would write every ISO twice on the usual OPL USB drive.
+_ZERO_FILL_FS_TYPES = frozenset({"vfat", "msdos", "exfat", "fuseblk"})
+
+
+def _deprioritize_copy_thread() -> None:
+    # Linux applies both settings to the calling thread only; elsewhere they would slow the whole server.
+    if not sys.platform.startswith("linux"):
+        return
+    try:
+        os.sched_setscheduler(0, os.SCHED_BATCH, os.sched_param(0))
+        os.nice(5)
+    except OSError:
+        pass
+
+
+COPY_EXECUTOR = ThreadPoolExecutor(
+    max_workers=IMPORT_PARALLELISM,
+    thread_name_prefix="iso-copy",
+    initializer=_deprioritize_copy_thread,
+)
+
+
+def _copy_file_range(in_fd: int, out_fd: int, offset: int, size: int) -> int:
+    while offset < size:
+        try:
+            copied = os.copy_file_range(in_fd, out_fd, min(_KERNEL_COPY_CHUNK, size - offset), offset, offset)
+        except OSError as exc:
+            if exc.errno in _COPY_FALLBACK_ERRNOS:
+                break
+            raise
+        if copied == 0:
+            break
+        offset += copied
+    return offset
+
+
+def _sendfile(in_fd: int, out_fd: int, offset: int, size: int) -> int:
+    os.lseek(out_fd, offset, os.SEEK_SET)
+    while offset < size:
+        try:
+            sent = os.sendfile(out_fd, in_fd, offset, min(_KERNEL_COPY_CHUNK, size - offset))
+        except OSError as exc:
+            if exc.errno in _COPY_FALLBACK_ERRNOS:
+                break
+            raise
+        if sent == 0:
+            break
+        offset += sent
+    return offset
+
+
+def _buffered_copy(fsrc: RawIOBase, fdst: RawIOBase, buffer: Optional[bytearray]) -> int:
+    view = memoryview(buffer if buffer is not None else bytearray(COPY_BUFSIZE))
+    copied = 0
+    while True:
+        read = fsrc.readinto(view)
+        if not read:
+            break
+        pending = view[:read]
+        while pending:
+            pending = pending[fdst.write(pending) :]
+        copied += read
+    return copied
+
+
+def _fs_type(fd: int) -> Optional[str]:
+    # mountinfo's third field is the st_dev major:minor, which ties the fd to its mount exactly.
+    dev = os.fstat(fd).st_dev
+    key = f"{os.major(dev)}:{os.minor(dev)}"
+    try:
+        with open("/proc/self/mountinfo", encoding="utf-8") as mounts:
+            for line in mounts:
+                fields = line.split()
+                if fields[2] == key:
+                    return fields[fields.index("-") + 1]
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def preallocate(fd: int, size: int) -> bool:
+    if size <= 0 or not hasattr(os, "posix_fallocate"):
+        return False
+    if sys.platform.startswith("linux") and _fs_type(fd) in _ZERO_FILL_FS_TYPES:
+        return False
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError:
+        return False
+    return True
+
+
+def _fadvise(fd: int, advice_name: str) -> None:
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        pass
+
+
+def disable_page_cache(fd: int) -> None:
+    # macOS has no posix_fadvise; F_NOCACHE keeps multi-GB ISO streams out of the unified buffer cache.
+    nocache = getattr(fcntl, "F_NOCACHE", None) if fcntl else None
+    if nocache is None:
+        return
+    try:
+        fcntl.fcntl(fd, nocache, 1)
+    except OSError:
+        pass
+
+
+def _kernel_copiers() -> list[Callable[[int, int, int, int], int]]:
+    copiers: list[Callable[[int, int, int, int], int]] = []
+    if hasattr(os, "copy_file_range"):
+        copiers.append(_copy_file_range)
+    if hasattr(os, "sendfile"):
+        copiers.append(_sendfile)
+    return copiers
+
+
+def kernel_copy(in_fd: int, out_fd: int, offset: int, size: int) -> int:
+    """Copy ``[offset, size)`` inside the kernel where possible; returns how far it got."""
+    for copier in _kernel_copiers():
+        if offset >= size:
+            break
+        offset = copier(in_fd, out_fd, offset, size)
+    return offset
+
+
+def same_filesystem(first: Path, second: Path) -> bool:
+    return first.stat().st_dev == second.stat().st_dev
+
+
+def fast_copy(src: Path, dst: Path, buffer: Optional[bytearray] = None) -> None:
+    # Copies data only: staged uploads carry no meaningful timestamps or xattrs, and FAT32 can't keep most of them.
+    size = src.stat().st_size
+    with src.open("rb", buffering=0) as fsrc, dst.open("wb", buffering=0) as fdst:
+        in_fd = fsrc.fileno()
+        out_fd = fdst.fileno()
+        _fadvise(in_fd, "POSIX_FADV_SEQUENTIAL")
+        disable_page_cache(in_fd)
+        disable_page_cache(out_fd)
+        preallocated = preallocate(out_fd, size)
+        offset = kernel_copy(in_fd, out_fd, 0, size)
+        if offset < size:
+            fsrc.seek(offset)
+            fdst.seek(offset)
+            offset += _buffered_copy(fsrc, fdst, buffer)
+        if preallocated and offset != size:
+            os.ftruncate(out_fd, offset)
+        # Neither side is read again by this process; release the pages for the next ISO.
+        _fadvise(in_fd, "POSIX_FADV_DONTNEED")
+        _fadvise(out_fd, "POSIX_FADV_DONTNEED")
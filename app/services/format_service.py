@@ -1,16 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import os
 import platform
 import plistlib
 import re
+import select
 import subprocess
 import time
 from pathlib import Path
 from typing import Any, Optional
 
+_VOLUME_LABEL_UNSAFE_RE = re.compile(r"[^A-Za-z0-9_-]")
+# ASCII labels (the usual case) are filtered with a deletion table; the regex covers everything else.
+_VOLUME_LABEL_DELETE = str.maketrans(
+    "", "", "".join(chr(c) for c in range(128) if not (chr(c).isalnum() or chr(c) in "_-"))
+)
+
 
 def sanitize_volume_label(label: str) -> str:
-    sanitized = re.sub(r"[^A-Za-z0-9_-]", "", label).upper()
+    if label.isascii():
+        sanitized = label.translate(_VOLUME_LABEL_DELETE).upper()
+    else:
+        sanitized = _VOLUME_LABEL_UNSAFE_RE.sub("", label).upper()
     if not sanitized:
         sanitized = "PS2USB"
     return sanitized[:11]
@@ -20,6 +32,22 @@ def run_cmd(args: list[str]) -> subprocess.CompletedProcess[str]:
     return subprocess.run(args, check=False, capture_output=True, text=True)
 
 
+async def run_cmd_async(args: list[str]) -> subprocess.CompletedProcess[str]:
+    # Same result shape as run_cmd, but the wait happens on the event loop instead of a worker thread.
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    return subprocess.CompletedProcess(
+        args,
+        proc.returncode if proc.returncode is not None else -1,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
 def diskutil_info(path_or_device: str) -> dict[str, Any]:
     result = run_cmd(["diskutil", "info", "-plist", path_or_device])
     if result.returncode != 0:
@@ -76,27 +104,72 @@ def _collect_mount_points(parsed: dict[str, Any]) -> list[str]:
     return unique_mount_points
 
 
-def wait_mount_point(
+def _watch_volumes() -> Optional[tuple[Any, int]]:
+    # macOS adds the mount point under /Volumes, so a vnode write on it means "look again now".
+    if not hasattr(select, "kqueue"):
+        return None
+    try:
+        fd = os.open("/Volumes", os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        kq = select.kqueue()
+        kq.control(
+            [select.kevent(fd, select.KQ_FILTER_VNODE, select.KQ_EV_ADD | select.KQ_EV_CLEAR, select.KQ_NOTE_WRITE)],
+            0,
+            0,
+        )
+    except OSError:
+        os.close(fd)
+        return None
+    return kq, fd
+
+
+async def wait_mount_point(
     device: str,
     expected_label: Optional[str] = None,
-    retries: int = 40,
-    delay_sec: float = 0.5,
+    timeout_sec: float = 20.0,
+    delay_sec: float = 0.25,
+    max_delay_sec: float = 1.0,
 ) -> Path:
-    for _ in range(retries):
-        list_result = run_cmd(["diskutil", "list", "-plist", f"/dev/{device}"])
-        if list_result.returncode == 0:
-            parsed = plistlib.loads(list_result.stdout.encode("utf-8"))
-            mount_points = _collect_mount_points(parsed)
-            if mount_points:
-                return Path(mount_points[0])
-
-        if expected_label:
-            volume_path = Path("/Volumes") / expected_label
-            if volume_path.exists() and volume_path.is_dir():
-                return volume_path
-        time.sleep(delay_sec)
+    # Poll quickly right after the erase, then back off so a slow mount spawns fewer diskutil processes.
+    deadline = time.monotonic() + timeout_sec
+    delay = delay_sec
+    last_listing: Optional[str] = None
+    watcher = _watch_volumes()
+    try:
+        while True:
+            list_result = await run_cmd_async(["diskutil", "list", "-plist", f"/dev/{device}"])
+            # An unchanged listing was already parsed and had no mount point.
+            if list_result.returncode == 0 and list_result.stdout != last_listing:
+                last_listing = list_result.stdout
+                parsed = plistlib.loads(list_result.stdout.encode("utf-8"))
+                mount_points = _collect_mount_points(parsed)
+                if mount_points:
+                    return Path(mount_points[0])
+
+            if expected_label:
+                volume_path = Path("/Volumes") / expected_label
+                if await asyncio.to_thread(volume_path.is_dir):
+                    return volume_path
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if watcher:
+                # Returns as soon as /Volumes changes; the timeout keeps diskutil polling as the fallback.
+                await asyncio.to_thread(watcher[0].control, None, 1, min(delay, remaining))
+            else:
+                await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 1.5, max_delay_sec)
+    finally:
+        if watcher:
+            watcher[0].close()
+            os.close(watcher[1])
     raise RuntimeError("formatted volume did not mount in time")
 
 
+_IS_MACOS = platform.system().lower() == "darwin"
+
+
 def is_macos() -> bool:
-    return platform.system().lower() == "darwin"
+    return _IS_MACOS
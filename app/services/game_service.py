@@ -1,32 +1,56 @@
 from __future__ import annotations
 
+import bisect
+import functools
 import hashlib
-import json
+import os
 import re
+import threading
 import time
 from pathlib import Path
 from typing import Any, Optional
 
+import orjson
 import pycdlib
 
+from app.core.constants import GENERATED_ID_HASH
+
+_GAME_ID_FULL_RE = re.compile(r"[A-Z]{4}_[0-9]{3}\.[0-9]{2}")
+_GAME_ID_BYTES_RE = re.compile(rb"([A-Z]{4}_[0-9]{3}\.[0-9]{2})")
+_SEED_CLEAN_RE = re.compile(r"[^A-Za-z0-9]+")
+_LOOKUP_KEY_RE = re.compile(r"[^a-z0-9]+")
+_STEM_ID_PREFIX_RE = re.compile(r"^[A-Z]{4}_[0-9]{3}\.[0-9]{2}[_\-\s.]*", re.IGNORECASE)
+_STEM_SEPARATOR_RE = re.compile(r"[_\-.]+")
+_OPL_UNSAFE_RE = re.compile(r"[^A-Za-z0-9\-\s\.\(\)\[\]]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Parsed lookup indexes per manifest file, keyed by path and validated against (st_mtime_ns, st_size).
+_MANIFEST_INDEXES: dict[str, tuple[int, int, dict[str, dict[str, str]]]] = {}
+_MANIFEST_INDEX_LOCK = threading.Lock()
+_SYSTEM_CNF_READ_BYTES = 2048
+
 
 def normalize_game_id(game_id: str) -> str:
     normalized = game_id.strip().upper()
-    if not re.fullmatch(r"[A-Z]{4}_[0-9]{3}\.[0-9]{2}", normalized):
+    if not _GAME_ID_FULL_RE.fullmatch(normalized):
         raise ValueError("game_id must match pattern like SLUS_209.46")
     return normalized
 
 
 def generate_game_id(seed: str) -> str:
-    cleaned = re.sub(r"[^A-Za-z0-9]+", "", seed).upper()
+    cleaned = _SEED_CLEAN_RE.sub("", seed).upper()
     if len(cleaned) < 4:
         cleaned = (cleaned + "AUTO")[:4]
     prefix = cleaned[:4]
-    digest = hashlib.sha1(seed.encode("utf-8")).hexdigest()
-    number = int(digest[:5], 16) % 100000
+    if GENERATED_ID_HASH == "blake2b":
+        number = int.from_bytes(hashlib.blake2b(seed.encode("utf-8"), digest_size=4).digest(), "big") % 100000
+    else:
+        digest = hashlib.sha1(seed.encode("utf-8")).hexdigest()
+        number = int(digest[:5], 16) % 100000
     return f"{prefix}_{number // 100:03d}.{number % 100:02d}"
 
 
+@functools.lru_cache(maxsize=2048)
 def resolve_game_id(game_id: Optional[str], seed: Optional[str]) -> tuple[str, bool]:
     if game_id and game_id.strip():
         return normalize_game_id(game_id), False
@@ -34,34 +58,28 @@ def resolve_game_id(game_id: Optional[str], seed: Optional[str]) -> tuple[str, b
     return generate_game_id(base), True
 
 
-def extract_game_id_from_system_cnf(content: str) -> Optional[str]:
-    match = re.search(r"([A-Z]{4}_[0-9]{3}\.[0-9]{2})", content.upper())
-    if not match:
-        return None
-    return match.group(1)
-
-
 def extract_game_id_from_iso(iso_path: Path) -> Optional[str]:
     iso = pycdlib.PyCdlib()
     try:
         iso.open(str(iso_path))
+        # ISO9660 records carry the ";1" version suffix; the bare path is only a fallback.
         candidates = ["/SYSTEM.CNF;1", "/SYSTEM.CNF"]
-        system_cnf_text: Optional[str] = None
+        system_cnf: bytes = b""
         for candidate in candidates:
             try:
-                import io
-
-                buffer = io.BytesIO()
-                iso.get_file_from_iso_fp(buffer, iso_path=candidate)
-                system_cnf_text = buffer.getvalue().decode("utf-8", errors="ignore")
-                if system_cnf_text.strip():
+                # BOOT2 sits at the top of a file well under one 2 KiB sector; don't copy the rest out.
+                with iso.open_file_from_iso(iso_path=candidate) as handle:
+                    system_cnf = handle.read(_SYSTEM_CNF_READ_BYTES)
+                if system_cnf.strip():
                     break
             except Exception:
                 continue
 
-        if not system_cnf_text:
+        # The ID is plain ASCII, so match on the raw bytes instead of decoding first.
+        match = _GAME_ID_BYTES_RE.search(system_cnf.upper())
+        if not match:
             return None
-        return extract_game_id_from_system_cnf(system_cnf_text)
+        return match.group(1).decode("ascii")
     except Exception:
         return None
     finally:
@@ -71,8 +89,16 @@ def extract_game_id_from_iso(iso_path: Path) -> Optional[str]:
             pass
 
 
+# Drops every ASCII character that is not a lowercase letter or digit in one C-level pass.
+_LOOKUP_KEY_DELETE = str.maketrans("", "", "".join(chr(c) for c in range(128) if not chr(c).isalnum() or chr(c).isupper()))
+
+
 def normalize_lookup_key(value: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "", value.lower())
+    lowered = value.lower()
+    if lowered.isascii():
+        return lowered.translate(_LOOKUP_KEY_DELETE)
+    # Non-ASCII names (e.g. Thai titles) still need every other code point stripped.
+    return _LOOKUP_KEY_RE.sub("", lowered)
 
 
 def manifest_path(target: Path) -> Path:
@@ -84,8 +110,7 @@ def load_manifest(target: Path) -> dict[str, Any]:
     if not manifest_file.exists():
         return {"entries": []}
     try:
-        with manifest_file.open("r", encoding="utf-8") as fh:
-            payload = json.load(fh)
+        payload = orjson.loads(manifest_file.read_bytes())
     except Exception:
         return {"entries": []}
     if not isinstance(payload, dict):
@@ -99,12 +124,41 @@ def load_manifest(target: Path) -> dict[str, Any]:
 def save_manifest(target: Path, manifest: dict[str, Any]) -> None:
     manifest_file = manifest_path(target)
     manifest_file.parent.mkdir(parents=True, exist_ok=True)
-    with manifest_file.open("w", encoding="utf-8") as fh:
-        json.dump(manifest, fh, ensure_ascii=True, indent=2)
+    tmp_file = manifest_file.with_name(f"{manifest_file.name}.tmp")
+    tmp_file.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+    os.replace(tmp_file, manifest_file)
+    # FAT32 mtimes have 2s resolution, so don't rely on the stat check alone after our own writes.
+    with _MANIFEST_INDEX_LOCK:
+        _MANIFEST_INDEXES.pop(str(manifest_file), None)
+
+
+# Fields that identify an existing manifest entry on upsert, mapped to the entry positions holding each value.
+_MERGE_FIELDS = ("source_key", "source_filename", "destination_key", "destination_filename")
+_MergeIndex = dict[tuple[str, str], list[int]]
+
 
+def _index_entry(index: _MergeIndex, entry: dict[str, Any], position: int) -> None:
+    for field in _MERGE_FIELDS:
+        value = entry.get(field)
+        if isinstance(value, str):
+            bisect.insort(index.setdefault((field, value), []), position)
 
-def upsert_manifest_entry(
-    target: Path,
+
+def _unindex_entry(index: _MergeIndex, entry: dict[str, Any], position: int) -> None:
+    for field in _MERGE_FIELDS:
+        value = entry.get(field)
+        if not isinstance(value, str):
+            continue
+        positions = index.get((field, value))
+        if positions and position in positions:
+            positions.remove(position)
+            if not positions:
+                del index[(field, value)]
+
+
+def _merge_manifest_entry(
+    entries: list[Any],
+    index: _MergeIndex,
     source_filename: str,
     game_name: str,
     game_id: str,
@@ -112,94 +166,125 @@ def upsert_manifest_entry(
     target_folder: str,
     destination_filename: str,
 ) -> None:
-    manifest = load_manifest(target)
-    entries = manifest.get("entries", [])
     source_key = normalize_lookup_key(Path(source_filename).stem)
     destination_key = normalize_lookup_key(Path(destination_filename).stem)
     game_key = normalize_lookup_key(game_name)
-    updated = False
+    record = {
+        "source_filename": source_filename,
+        "source_key": source_key,
+        "game_name": game_name,
+        "game_name_key": game_key,
+        "game_id": game_id,
+        "id_source": id_source,
+        "target_folder": target_folder,
+        "destination_filename": destination_filename,
+        "destination_key": destination_key,
+        "updated_at": int(time.time()),
+    }
+    # The earliest entry matching any identifying field wins, as with a front-to-back scan.
+    matches = [index[(field, record[field])][0] for field in _MERGE_FIELDS if (field, record[field]) in index]
+    if matches:
+        position = min(matches)
+        entry = entries[position]
+        _unindex_entry(index, entry, position)
+        entry.update(record)
+        _index_entry(index, entry, position)
+        return
+    entries.append(record)
+    _index_entry(index, record, len(entries) - 1)
+
+
+def upsert_manifest_entries(target: Path, records: list[dict[str, str]]) -> None:
+    if not records:
+        return
+    manifest = load_manifest(target)
+    entries = manifest.get("entries", [])
+    index: _MergeIndex = {}
+    for position, entry in enumerate(entries):
+        if isinstance(entry, dict):
+            _index_entry(index, entry, position)
+    for record in records:
+        _merge_manifest_entry(entries, index, **record)
+    manifest["entries"] = entries
+    save_manifest(target, manifest)
+
+
+def _build_manifest_index(entries: list[Any]) -> dict[str, dict[str, str]]:
+    # setdefault keeps the first matching entry, mirroring the original in-order scan.
+    by_key: dict[str, str] = {}
+    by_name: dict[str, str] = {}
+    by_game_key: dict[str, str] = {}
     for entry in entries:
         if not isinstance(entry, dict):
             continue
-        if (
-            entry.get("source_key") == source_key
-            or entry.get("source_filename") == source_filename
-            or entry.get("destination_key") == destination_key
-            or entry.get("destination_filename") == destination_filename
+        game_id = entry.get("game_id")
+        if not isinstance(game_id, str) or not game_id:
+            continue
+        for field, index in (
+            ("source_key", by_key),
+            ("destination_key", by_key),
+            ("source_filename", by_name),
+            ("destination_filename", by_name),
+            ("game_name_key", by_game_key),
         ):
-            entry.update(
-                {
-                    "source_filename": source_filename,
-                    "source_key": source_key,
-                    "game_name": game_name,
-                    "game_name_key": game_key,
-                    "game_id": game_id,
-                    "id_source": id_source,
-                    "target_folder": target_folder,
-                    "destination_filename": destination_filename,
-                    "destination_key": destination_key,
-                    "updated_at": int(time.time()),
-                }
-            )
-            updated = True
-            break
-    if not updated:
-        entries.append(
-            {
-                "source_filename": source_filename,
-                "source_key": source_key,
-                "game_name": game_name,
-                "game_name_key": game_key,
-                "game_id": game_id,
-                "id_source": id_source,
-                "target_folder": target_folder,
-                "destination_filename": destination_filename,
-                "destination_key": destination_key,
-                "updated_at": int(time.time()),
-            }
-        )
-    manifest["entries"] = entries
-    save_manifest(target, manifest)
+            value = entry.get(field)
+            if isinstance(value, str) and value:
+                index.setdefault(value, game_id)
+    return {"key": by_key, "name": by_name, "game_key": by_game_key}
+
+
+def _manifest_index(target: Path) -> Optional[dict[str, dict[str, str]]]:
+    manifest_file = manifest_path(target)
+    try:
+        stat_result = manifest_file.stat()
+    except OSError:
+        return None
+    cache_key = str(manifest_file)
+    with _MANIFEST_INDEX_LOCK:
+        cached = _MANIFEST_INDEXES.get(cache_key)
+        if cached and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+            return cached[2]
+    index = _build_manifest_index(load_manifest(target)["entries"])
+    with _MANIFEST_INDEX_LOCK:
+        _MANIFEST_INDEXES[cache_key] = (stat_result.st_mtime_ns, stat_result.st_size, index)
+    return index
 
 
 def lookup_game_id_from_manifest(target: Path, source_filename: Optional[str], game_name: Optional[str]) -> Optional[str]:
-    manifest = load_manifest(target)
-    entries = manifest.get("entries", [])
+    index = _manifest_index(target)
+    if not index:
+        return None
     source_key = normalize_lookup_key(Path(source_filename).stem) if source_filename else ""
     source_name = source_filename.strip() if source_filename else ""
     game_key = normalize_lookup_key(game_name) if game_name else ""
-    for entry in entries:
-        if not isinstance(entry, dict):
-            continue
-        if source_key and (entry.get("source_key") == source_key or entry.get("destination_key") == source_key):
-            game_id = entry.get("game_id")
-            if isinstance(game_id, str) and game_id:
-                return game_id
-    for entry in entries:
-        if not isinstance(entry, dict):
-            continue
-        if source_name and (entry.get("source_filename") == source_name or entry.get("destination_filename") == source_name):
-            game_id = entry.get("game_id")
-            if isinstance(game_id, str) and game_id:
-                return game_id
-    for entry in entries:
-        if not isinstance(entry, dict):
-            continue
-        if game_key and entry.get("game_name_key") == game_key:
-            game_id = entry.get("game_id")
-            if isinstance(game_id, str) and game_id:
-                return game_id
+    if source_key and source_key in index["key"]:
+        return index["key"][source_key]
+    if source_name and source_name in index["name"]:
+        return index["name"][source_name]
+    if game_key and game_key in index["game_key"]:
+        return index["game_key"][game_key]
     return None
 
 
 def extract_game_id_from_filename(source_filename: Optional[str]) -> Optional[str]:
     if not source_filename:
         return None
-    name = Path(source_filename).name
-    match = re.match(r"^([A-Z]{4}_[0-9]{3}\.[0-9]{2})(?:[._\-\s]|$)", name.upper())
-    if not match:
+    name = Path(source_filename).name.upper()
+    # Fixed-width "AAAA_DDD.DD" prefix checked by hand; same as matching
+    # r"^([A-Z]{4}_[0-9]{3}\.[0-9]{2})(?:[._\-\s]|$)" without the regex engine.
+    if len(name) < 11 or name[4] != "_" or name[8] != ".":
+        return None
+    prefix = name[:11]
+    if not (
+        prefix.isascii()
+        and prefix[:4].isalpha()
+        and prefix[5:8].isdigit()
+        and prefix[9:11].isdigit()
+    ):
+        return None
+    if len(name) > 11 and not (name[11] in "._-" or name[11].isspace()):
         return None
-    return match.group(1)
+    return prefix
 
 
 def remove_manifest_entries(target: Path, game_id: str, destination_filename: Optional[str] = None) -> int:
@@ -248,8 +333,8 @@ def build_opl_iso_filename(game_id: str, source_filename: str, game_name: Option
             resolved_name = Path(original).stem
 
     # OPL-safe filename: keep only common characters and collapse separators.
-    cleaned = re.sub(r"[^A-Za-z0-9\-\s\.\(\)\[\]]+", " ", resolved_name)
-    cleaned = re.sub(r"\s+", " ", cleaned).strip(" .")
+    cleaned = _OPL_UNSAFE_RE.sub(" ", resolved_name)
+    cleaned = _WHITESPACE_RE.sub(" ", cleaned).strip(" .")
     if not cleaned:
         cleaned = "GAME"
     return f"{game_id}.{cleaned}{ext}"
@@ -268,6 +353,7 @@ def resolve_game_id_for_target(target: Optional[Path], game_name: Optional[str],
     return game_id, generated, "generated"
 
 
+@functools.lru_cache(maxsize=2048)
 def derive_game_name(game_name: Optional[str], source_filename: Optional[str]) -> str:
     if game_name and game_name.strip():
         return game_name.strip()
@@ -275,8 +361,8 @@ def derive_game_name(game_name: Optional[str], source_filename: Optional[str]) -
         raise ValueError("game_name or source_filename is required")
 
     stem = Path(source_filename.strip()).stem
-    stem = re.sub(r"^[A-Z]{4}_[0-9]{3}\.[0-9]{2}[_\-\s.]*", "", stem, flags=re.IGNORECASE)
-    stem = re.sub(r"[_\-.]+", " ", stem).strip()
+    stem = _STEM_ID_PREFIX_RE.sub("", stem)
+    stem = _STEM_SEPARATOR_RE.sub(" ", stem).strip()
     if not stem:
         raise ValueError("could not derive game name from source filename")
     return stem
@@ -1,48 +1,140 @@
 from __future__ import annotations
 
+import functools
 import os
+import shutil
+import stat
+import threading
+import time
 from pathlib import Path
 
-from app.core.constants import REQUIRED_FOLDERS, SPACE_BUFFER_MIN_BYTES, SPACE_BUFFER_RATIO
+from app.core.constants import (
+    REQUIRED_FOLDER_SET,
+    REQUIRED_FOLDERS,
+    SPACE_BUFFER_DEN,
+    SPACE_BUFFER_MIN_BYTES,
+    SPACE_BUFFER_NUM,
+    TARGET_CACHE_TTL_SEC,
+)
+
+_RESOLVED_TARGETS: dict[str, tuple[float, Path]] = {}
+_VALIDATED_TARGETS: dict[str, float] = {}
+_PREPARED_TARGETS: dict[str, float] = {}
+_TARGET_CACHE_LOCK = threading.Lock()
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
+def _cache_fresh(cache: dict[str, float], key: str, now_ts: float) -> bool:
+    ts = cache.get(key)
+    if ts is None:
+        return False
+    if now_ts - ts > TARGET_CACHE_TTL_SEC:
+        cache.pop(key, None)
+        return False
+    return True
+
+
+def invalidate_target_cache(target: Path) -> None:
+    key = str(target)
+    with _TARGET_CACHE_LOCK:
+        _VALIDATED_TARGETS.pop(key, None)
+        _PREPARED_TARGETS.pop(key, None)
 
 
 def resolve_target(target_path: str) -> Path:
-    return Path(target_path).expanduser().resolve()
+    now_ts = time.monotonic()
+    with _TARGET_CACHE_LOCK:
+        entry = _RESOLVED_TARGETS.get(target_path)
+        if entry and now_ts - entry[0] <= TARGET_CACHE_TTL_SEC:
+            return entry[1]
+    resolved = Path(target_path).expanduser().resolve()
+    with _TARGET_CACHE_LOCK:
+        _RESOLVED_TARGETS[target_path] = (now_ts, resolved)
+    return resolved
 
 
 def validate_target_access(target: Path) -> tuple[bool, str]:
-    if not target.exists():
+    key = str(target)
+    with _TARGET_CACHE_LOCK:
+        if _cache_fresh(_VALIDATED_TARGETS, key, time.monotonic()):
+            return True, "ok"
+    try:
+        target_stat = target.stat()
+    except (FileNotFoundError, NotADirectoryError):
         return False, "target path does not exist"
-    if not target.is_dir():
+    if not stat.S_ISDIR(target_stat.st_mode):
         return False, "target path is not a directory"
     if not os.access(target, os.R_OK | os.W_OK | os.X_OK):
         return False, "target path is not writable"
+    with _TARGET_CACHE_LOCK:
+        _VALIDATED_TARGETS[key] = time.monotonic()
     return True, "ok"
 
 
 def ensure_required_folders(target: Path) -> tuple[list[str], list[str]]:
+    key = str(target)
+    with _TARGET_CACHE_LOCK:
+        if _cache_fresh(_PREPARED_TARGETS, key, time.monotonic()):
+            return [], []
+    with os.scandir(target) as entries:
+        present = {entry.name: entry.is_dir() for entry in entries if entry.name in REQUIRED_FOLDER_SET}
     missing: list[str] = []
     created: list[str] = []
     for folder in REQUIRED_FOLDERS:
+        is_dir = present.get(folder)
+        if is_dir:
+            continue
         folder_path = target / folder
-        if folder_path.exists() and not folder_path.is_dir():
+        if is_dir is not None:
             raise NotADirectoryError(f"required path exists but is not a directory: {folder_path}")
-        if not folder_path.exists():
-            missing.append(folder)
-            folder_path.mkdir(parents=True, exist_ok=True)
-            created.append(folder)
+        # Case-insensitive file systems (FAT32) may list the folder under a different case.
+        try:
+            mode = folder_path.stat().st_mode
+        except FileNotFoundError:
+            mode = None
+        if mode is not None:
+            if stat.S_ISDIR(mode):
+                continue
+            raise NotADirectoryError(f"required path exists but is not a directory: {folder_path}")
+        missing.append(folder)
+        folder_path.mkdir(parents=True, exist_ok=True)
+        created.append(folder)
+    with _TARGET_CACHE_LOCK:
+        _PREPARED_TARGETS[key] = time.monotonic()
     return missing, created
 
 
+def existing_required_folders(target: Path) -> list[str]:
+    with os.scandir(target) as entries:
+        listed = {entry.name: entry.is_dir() for entry in entries if entry.name in REQUIRED_FOLDER_SET}
+    existing = [folder for folder, is_dir in listed.items() if is_dir]
+    for folder in REQUIRED_FOLDER_SET.difference(listed):
+        # Same case-insensitive (FAT32) fallback as ensure_required_folders.
+        try:
+            if stat.S_ISDIR((target / folder).stat().st_mode):
+                existing.append(folder)
+        except FileNotFoundError:
+            pass
+    return sorted(existing)
+
+
+def free_space(target: Path) -> int:
+    # Only the free figure is needed mid-import; statvfs skips disk_usage's total/used math.
+    if not hasattr(os, "statvfs"):
+        return shutil.disk_usage(target).free
+    result = os.statvfs(target)
+    return result.f_bavail * result.f_frsize
+
+
+@functools.lru_cache(maxsize=256)
 def compute_buffer(total_iso_bytes: int) -> int:
-    return max(int(total_iso_bytes * SPACE_BUFFER_RATIO), SPACE_BUFFER_MIN_BYTES)
+    return max(total_iso_bytes * SPACE_BUFFER_NUM // SPACE_BUFFER_DEN, SPACE_BUFFER_MIN_BYTES)
 
 
+@functools.lru_cache(maxsize=256)
 def human_bytes(size: int) -> str:
-    units = ["B", "KB", "MB", "GB", "TB"]
-    value = float(size)
-    for unit in units:
-        if value < 1024.0 or unit == units[-1]:
-            return f"{value:.2f} {unit}"
-        value /= 1024.0
-    return f"{size} B"
+    if size < 1024:
+        return f"{float(size):.2f} B"
+    # Each unit is 2**10 of the previous one, so the bit length picks the unit directly.
+    unit_idx = min((size.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size / (1 << (unit_idx * 10)):.2f} {_SIZE_UNITS[unit_idx]}"